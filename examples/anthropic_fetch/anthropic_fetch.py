@@ -1,4 +1,4 @@
-import httpx, asyncio, markdownify
+import httpx, asyncio, functools, markdownify
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -6,6 +6,24 @@ logger = logging.getLogger(__name__)
 
 MAX_LEN = 10_000           # keep responses small for token limits
 
+# Shared client: connection pool, TLS sessions and HTTP/2 connections are reused
+# across requests instead of being set up for every fetch
+CLIENT = httpx.AsyncClient(
+    timeout=20,
+    follow_redirects=True,
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=50),
+)
+
+async def shutdown() -> None:
+    """Close the shared client (the Skilletfile's ``shutdown`` hook)."""
+    await CLIENT.aclose()
+
+@functools.lru_cache(maxsize=256)
+def _md(chunk: str) -> str:
+    """HTML -> Markdown, memoized by the exact HTML window (an unchanged page is never reparsed)."""
+    return markdownify.markdownify(chunk)
+
 async def handler(params: dict) -> dict:
     """
     params:
@@ -18,28 +36,39 @@ async def handler(params: dict) -> dict:
         as_md = params.get("as_markdown", False)
         start_index = max(0, int(params.get("start_index", 0) or 0))
         
-        logger.info(f"Fetching URL: {url}, as_markdown: {as_md}, start_index: {start_index}")
+        logger.info("Fetching URL: %s, as_markdown: %s, start_index: %d", url, as_md, start_index)
         
-        async with httpx.AsyncClient(timeout=20, follow_redirects=True) as client:
-            r = await client.get(url)
+        # Stream the body and stop once the requested window is covered, so a large
+        # page is neither downloaded nor decoded past start_index + MAX_LEN.
+        # aiter_text() decodes incrementally, keeping start_index in characters.
+        end = start_index + MAX_LEN
+        parts = []
+        received = 0
+        async with CLIENT.stream("GET", url) as r:
             r.raise_for_status()
-            content = r.text
-            
-        logger.info(f"Received content length: {len(content)}")
+            async for text in r.aiter_text():
+                parts.append(text)
+                received += len(text)
+                if received >= end:
+                    break
+        content = "".join(parts)
+        
+        logger.info("Received content length: %d", len(content))
         
         # paging
         chunk = content[start_index : start_index + MAX_LEN]
-        logger.info(f"Chunk length: {len(chunk)}")
+        logger.info("Chunk length: %d", len(chunk))
         
         if as_md:
-            md_chunk = markdownify.markdownify(chunk)
+            # CPU-bound BeautifulSoup traversal: keep it off the event loop
+            md_chunk = await asyncio.to_thread(_md, chunk)
             logger.info("Converted to markdown")
             return {"html": None, "markdown": md_chunk}
         else:
             return {"html": chunk, "markdown": None}
         
     except Exception as e:
-        logger.error(f"Error in handler: {str(e)}", exc_info=True)
+        logger.error("Error in handler: %s", e, exc_info=True)
         raise
 
 # Local debug
@@ -1,4 +1,4 @@
-import typer, yaml, shutil, subprocess, tempfile, os, textwrap, sys, uvicorn
+import typer, os, textwrap, sys
 from pathlib import Path
 
 app = typer.Typer(help="Fliiq Skillet CLI (MVP)")
@@ -41,16 +41,28 @@ def new(name: str):
 @app.command()
 def dev():
     """Run local FastAPI dev server."""
+    import uvicorn  # deferred: only the dev server needs it
     # assumes cwd contains Skilletfile.yaml
     os.environ["SKILLETFILE"] = "Skilletfile.yaml"
     uvicorn.run("skillet_runtime:app", reload=True, port=8000)
 
 @app.command()
 def build():
+    import compileall, py_compile, shutil, tempfile
     typer.echo("Packaging zip for AWS Lambda (MVP-placeholder)")
     tmp = tempfile.mkdtemp()
-    shutil.make_archive("skill", "zip", ".")
-    typer.echo("Created skill.zip")
+    # Stage a clean copy (no stale bytecode, no previous skill.zip) and precompile it,
+    # so the first import at runtime does not have to compile or write .pyc files.
+    # zipimport only picks up legacy-layout .pyc files sitting next to their source,
+    # and unchecked-hash pycs are used without stat'ing the source.
+    stage = os.path.join(tmp, "skill")
+    shutil.copytree(".", stage, ignore=shutil.ignore_patterns("__pycache__", "*.pyc", "*.cache.pkl", "skill.zip"))
+    compileall.compile_dir(stage, quiet=1, legacy=True, workers=0,
+                           invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+    archive = shutil.make_archive(os.path.join(tmp, "skill"), "zip", stage)
+    shutil.move(archive, "skill.zip")
+    shutil.rmtree(tmp, ignore_errors=True)
+    typer.echo("Created skill.zip (run with SKILL_ZIP=skill.zip PYTHONDONTWRITEBYTECODE=1 to import the skill from it)")
 
 @app.command()
 def deploy():
@@ -3,8 +3,11 @@
 MEMORY_STORE = {}
 
 import os
-import json
-from typing import Dict, List, Any, Optional
+import atexit
+import asyncio
+import orjson
+from itertools import islice
+from typing import AsyncIterator, Dict, List, Any, Optional, Set, Tuple
 from fastapi import HTTPException
 import logging
 
@@ -16,34 +19,147 @@ logger = logging.getLogger(__name__)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 MEMORY_FILE_PATH = os.getenv("MEMORY_FILE_PATH", os.path.join(SCRIPT_DIR, "memory.json"))
 
+# Mutations arriving within this window are coalesced into a single file write.
+SAVE_DELAY_SECONDS = float(os.getenv("MEMORY_SAVE_DELAY", "0.25"))
+
+# Relations are identified by their (from, to, relationType) triple.
+RelationKey = Tuple[str, str, str]
+
+def _relation_key(rel: Dict) -> RelationKey:
+    return (rel.get("from"), rel.get("to"), rel.get("relationType"))
+
+def _unindex(index: Dict[str, Set[RelationKey]], name: str, key: RelationKey):
+    """Drops ``key`` from an endpoint index, and the endpoint itself once it has no relations left."""
+    keys = index.get(name)
+    if keys is not None:
+        keys.discard(key)
+        if not keys:
+            del index[name]
+
+# Number of entities / relations encoded per chunk when streaming read_graph.
+STREAM_CHUNK_SIZE = 256
+
+def _json_default(obj: Any) -> Any:
+    """orjson fallback: observations are held as sets in memory and written as arrays."""
+    if isinstance(obj, set):
+        return list(obj)
+    raise TypeError
+
 class KnowledgeGraph:
     """Manages the knowledge graph, including persistence."""
     def __init__(self, filepath: str):
         self.filepath = filepath
         self.entities: Dict[str, Dict[str, Any]] = {}
-        self.relations: List[Dict[str, str]] = []
+        self.relations: Dict[RelationKey, Dict[str, str]] = {}
+        self._by_from: Dict[str, Set[RelationKey]] = {}
+        self._by_to: Dict[str, Set[RelationKey]] = {}
+        # name -> (lowered name, lowered entityType, lowered observations); filled lazily by search_nodes
+        self._lower_cache: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {}
+        # Bumped on every mutation; together with the per-process epoch it forms
+        # the read_graph etag, so an etag from before a restart never matches
+        self.version = 0
+        self._epoch = os.urandom(4).hex()
+        self._dirty = False
+        self._save_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
         self._load()
 
     def _load(self):
         """Loads the graph from the JSON file."""
         if os.path.exists(self.filepath):
             try:
-                with open(self.filepath, 'r') as f:
-                    data = json.load(f)
+                with open(self.filepath, 'rb') as f:
+                    data = orjson.loads(f.read())
                     self.entities = data.get("entities", {})
-                    self.relations = data.get("relations", [])
+                    for entity in self.entities.values():
+                        entity["observations"] = set(entity.get("observations", []))
+                    for rel in data.get("relations", []):
+                        self._add_relation(rel)
                 logger.info(f"Knowledge graph loaded from {self.filepath}")
-            except (json.JSONDecodeError, IOError) as e:
+            except (orjson.JSONDecodeError, IOError) as e:
                 logger.error(f"Error loading {self.filepath}: {e}. Starting with an empty graph.")
-                self.entities, self.relations = {}, []
+                self.entities = {}
+                self.relations, self._by_from, self._by_to = {}, {}, {}
         else:
             logger.info("No memory file found. Starting with an empty graph.")
 
+    def _add_relation(self, rel: Dict) -> bool:
+        """Stores a relation and indexes it by both endpoints. Returns False if it already exists."""
+        key = _relation_key(rel)
+        if key in self.relations:
+            return False
+        self.relations[key] = rel
+        self._by_from.setdefault(key[0], set()).add(key)
+        self._by_to.setdefault(key[1], set()).add(key)
+        return True
+
+    def _remove_relation(self, key: RelationKey) -> bool:
+        """Removes a relation and its index entries. Returns False if it was not present."""
+        if self.relations.pop(key, None) is None:
+            return False
+        _unindex(self._by_from, key[0], key)
+        _unindex(self._by_to, key[1], key)
+        return True
+
     def _save(self):
-        """Saves the graph to the JSON file."""
+        """
+        Marks the graph dirty and schedules a write.
+
+        Inside an event loop the write is deferred by SAVE_DELAY_SECONDS so a burst
+        of mutations costs one file rewrite instead of one per call, and the file I/O
+        itself runs in a worker thread so it never blocks request handling. Without a
+        running loop (e.g. direct use from a script) the graph is written immediately.
+        """
+        self.version += 1
+        self._dirty = True
+        if self._save_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        self._save_handle = loop.call_later(SAVE_DELAY_SECONDS, self._schedule_flush)
+
+    def _serialize(self) -> bytes:
+        return orjson.dumps({"entities": self.entities, "relations": list(self.relations.values())}, default=_json_default, option=orjson.OPT_INDENT_2)
+
+    def _write(self, payload: bytes):
+        """Writes the serialized graph to a temp file and swaps it into place atomically."""
+        tmp_path = f"{self.filepath}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, self.filepath)
+
+    def _schedule_flush(self):
+        self._save_handle = None
+        self._flush_task = asyncio.get_running_loop().create_task(self._flush_async())
+
+    async def _flush_async(self):
+        """Snapshots the graph on the event loop, then writes it from a worker thread."""
+        async with self._write_lock:
+            if not self._dirty:
+                return
+            payload = self._serialize()
+            self._dirty = False
+            try:
+                await asyncio.to_thread(self._write, payload)
+                logger.info(f"Knowledge graph saved to {self.filepath}")
+            except IOError as e:
+                self._dirty = True
+                logger.error(f"Error saving to {self.filepath}: {e}")
+
+    def flush(self):
+        """Synchronously writes any pending changes (used at exit and outside an event loop)."""
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        if not self._dirty:
+            return
         try:
-            with open(self.filepath, 'w') as f:
-                json.dump({"entities": self.entities, "relations": self.relations}, f, indent=2)
+            self._write(self._serialize())
+            self._dirty = False
             logger.info(f"Knowledge graph saved to {self.filepath}")
         except IOError as e:
             logger.error(f"Error saving to {self.filepath}: {e}")
@@ -54,9 +170,10 @@ class KnowledgeGraph:
         for entity in entities:
             name = entity.get("name")
             if name and name not in self.entities:
+                self._lower_cache.pop(name, None)
                 self.entities[name] = {
                     "entityType": entity.get("entityType", "unknown"),
-                    "observations": list(set(entity.get("observations", [])))
+                    "observations": set(entity.get("observations", []))
                 }
                 count += 1
         if count > 0:
@@ -67,8 +184,7 @@ class KnowledgeGraph:
         count = 0
         for rel in relations:
             if rel.get("from") in self.entities and rel.get("to") in self.entities:
-                if rel not in self.relations:
-                    self.relations.append(rel)
+                if self._add_relation(rel):
                     count += 1
         if count > 0:
             self._save()
@@ -79,12 +195,11 @@ class KnowledgeGraph:
         for obs in observations:
             entity_name = obs.get("entityName")
             if entity_name in self.entities:
-                existing_obs = set(self.entities[entity_name].get("observations", []))
-                new_obs = set(obs.get("contents", []))
+                existing_obs = self.entities[entity_name]["observations"]
                 original_size = len(existing_obs)
-                existing_obs.update(new_obs)
+                existing_obs.update(obs.get("contents", []))
                 if len(existing_obs) > original_size:
-                    self.entities[entity_name]["observations"] = list(existing_obs)
+                    self._lower_cache.pop(entity_name, None)
                     updated_count += 1
         if updated_count > 0:
             self._save()
@@ -95,7 +210,9 @@ class KnowledgeGraph:
         for name in entity_names:
             if name in self.entities:
                 del self.entities[name]
-                self.relations = [r for r in self.relations if r['from'] != name and r['to'] != name]
+                self._lower_cache.pop(name, None)
+                for key in self._by_from.pop(name, set()) | self._by_to.pop(name, set()):
+                    self._remove_relation(key)
                 deleted_count += 1
         if deleted_count > 0:
             self._save()
@@ -106,37 +223,95 @@ class KnowledgeGraph:
         for item in deletions:
             name = item.get("entityName")
             if name in self.entities:
-                obs_to_delete = set(item.get("observations", []))
-                current_obs = set(self.entities[name].get("observations", []))
+                current_obs = self.entities[name]["observations"]
                 original_size = len(current_obs)
-                current_obs -= obs_to_delete
+                current_obs.difference_update(item.get("observations", []))
                 if len(current_obs) < original_size:
-                     self.entities[name]["observations"] = list(current_obs)
-                     updated_count += 1
+                    self._lower_cache.pop(name, None)
+                    updated_count += 1
         if updated_count > 0:
             self._save()
         return {"success": True, "message": f"Observations deleted from {updated_count} entities."}
 
     def delete_relations(self, relations_to_delete: List[Dict]) -> Dict:
-        original_count = len(self.relations)
-        self.relations = [r for r in self.relations if r not in relations_to_delete]
-        deleted_count = original_count - len(self.relations)
+        deleted_count = sum(self._remove_relation(_relation_key(rel)) for rel in relations_to_delete)
         if deleted_count > 0:
             self._save()
         return {"success": True, "message": f"Successfully deleted {deleted_count} relations."}
 
-    def read_graph(self) -> Dict:
-        return {"success": True, "graph": {"entities": self.entities, "relations": self.relations}}
+    def _graph_page(self, args: Optional[Dict]) -> Tuple[str, Optional[List], Optional[List]]:
+        """
+        Resolves the read_graph arguments to an etag and the entity/relation slices to return.
+
+        Args:
+            args: Optional ``offset``/``limit`` (applied to entities and relations alike)
+                and ``etag`` from a previous read. The slices are None when ``etag``
+                still matches, i.e. the graph has not changed since that read.
+                Anything other than a dict is ignored, as read_graph ignored params
+                before it took arguments.
+        """
+        args = args if isinstance(args, dict) else {}
+        etag = f"{self._epoch}-{self.version}"
+        if args.get("etag") == etag:
+            return etag, None, None
+        offset = args.get("offset") or 0
+        limit = args.get("limit")
+        if not isinstance(offset, int) or offset < 0 or (limit is not None and (not isinstance(limit, int) or limit < 0)):
+            raise HTTPException(status_code=400, detail="'offset' and 'limit' must be non-negative integers.")
+        stop = None if limit is None else offset + limit
+        entities = list(islice(self.entities.items(), offset, stop))
+        relations = list(islice(self.relations.values(), offset, stop))
+        return etag, entities, relations
+
+    def read_graph(self, args: Optional[Dict] = None) -> Dict:
+        etag, entities, relations = self._graph_page(args)
+        if entities is None:
+            return {"success": True, "not_modified": True, "etag": etag}
+        return {"success": True, "etag": etag, "graph": {"entities": dict(entities), "relations": relations}}
+
+    def stream_graph(self, args: Optional[Dict] = None) -> AsyncIterator[bytes]:
+        """
+        Same result as read_graph, yielded as JSON chunks so a large graph is never
+        encoded into one buffer. The page is fixed (and the arguments validated) when
+        called; chunks are encoded on the event loop, so they never observe a
+        half-applied mutation.
+        """
+        return self._graph_chunks(*self._graph_page(args))
+
+    async def _graph_chunks(self, etag: str, entities: Optional[List], relations: Optional[List]) -> AsyncIterator[bytes]:
+        if entities is None:
+            yield orjson.dumps({"success": True, "not_modified": True, "etag": etag})
+            return
+        yield b'{"success":true,"etag":' + orjson.dumps(etag) + b',"graph":{"entities":{'
+        for i in range(0, len(entities), STREAM_CHUNK_SIZE):
+            chunk = b",".join(
+                orjson.dumps(name) + b":" + orjson.dumps(data, default=_json_default)
+                for name, data in entities[i:i + STREAM_CHUNK_SIZE]
+            )
+            yield chunk if i == 0 else b"," + chunk
+        yield b'},"relations":['
+        for i in range(0, len(relations), STREAM_CHUNK_SIZE):
+            chunk = orjson.dumps(relations[i:i + STREAM_CHUNK_SIZE])[1:-1]
+            yield chunk if i == 0 else b"," + chunk
+        yield b"]}}"
 
     def search_nodes(self, query: str) -> Dict:
         if not query:
             return {"success": False, "nodes": [], "message": "Query cannot be empty."}
         
         query = query.lower()
+        lower_cache = self._lower_cache
         results = []
         for name, data in self.entities.items():
-            if query in name.lower() or query in data.get('entityType', '').lower() \
-               or any(query in obs.lower() for obs in data.get('observations', [])):
+            lowered = lower_cache.get(name)
+            if lowered is None:
+                lowered = lower_cache[name] = (
+                    name.lower(),
+                    data.get('entityType', '').lower(),
+                    tuple(obs.lower() for obs in data.get('observations', ())),
+                )
+            lname, ltype, lobs = lowered
+            if query in lname or query in ltype or any(query in lo for lo in lobs):
                 results.append({"name": name, **data})
         return {"success": True, "nodes": results}
 
@@ -147,9 +322,23 @@ class KnowledgeGraph:
 # Create a single, global instance of the knowledge graph.
 # This is crucial for maintaining state between requests.
 graph = KnowledgeGraph(MEMORY_FILE_PATH)
+atexit.register(graph.flush)
 
-def handler(params: dict) -> dict:
-    """Dispatches requests to the appropriate KnowledgeGraph method."""
+DISPATCH_MAP = {
+    "create_entities": (graph.create_entities, "entities"),
+    "create_relations": (graph.create_relations, "relations"),
+    "add_observations": (graph.add_observations, "observations"),
+    "delete_entities": (graph.delete_entities, "entityNames"),
+    "delete_observations": (graph.delete_observations, "deletions"),
+    "delete_relations": (graph.delete_relations, "relations"),
+    # read_graph takes the whole params object (offset / limit / etag, all optional)
+    "read_graph": (graph.read_graph, None),
+    "search_nodes": (graph.search_nodes, "query"),
+    "open_nodes": (graph.open_nodes, "names"),
+}
+
+def _parse_request(params: dict) -> Tuple[str, Dict]:
+    """Validates the operation name and decodes the JSON-encoded 'params' string."""
     operation = params.get("operation")
     if not operation:
         raise HTTPException(status_code=400, detail="'operation' field is required.")
@@ -159,34 +348,35 @@ def handler(params: dict) -> dict:
     args_str = params.get("params", "{}")
     try:
         # Handle the case where params might not be provided for no-arg operations
-        args = json.loads(args_str) if args_str else {}
-    except json.JSONDecodeError:
+        args = orjson.loads(args_str) if args_str else {}
+    except orjson.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid JSON format in 'params' field.")
 
-    dispatch_map = {
-        "create_entities": (graph.create_entities, "entities"),
-        "create_relations": (graph.create_relations, "relations"),
-        "add_observations": (graph.add_observations, "observations"),
-        "delete_entities": (graph.delete_entities, "entityNames"),
-        "delete_observations": (graph.delete_observations, "deletions"),
-        "delete_relations": (graph.delete_relations, "relations"),
-        "read_graph": (graph.read_graph, None),
-        "search_nodes": (graph.search_nodes, "query"),
-        "open_nodes": (graph.open_nodes, "names"),
-    }
-
-    if operation not in dispatch_map:
+    if operation not in DISPATCH_MAP:
         raise HTTPException(status_code=400, detail=f"Invalid operation: {operation}")
+    return operation, args
 
-    method, param_key = dispatch_map[operation]
-    
-    result = {}
+def _execute(operation: str, args: Dict) -> Dict:
+    """Dispatches a parsed request to the appropriate KnowledgeGraph method."""
+    method, param_key = DISPATCH_MAP[operation]
     if param_key:
         if param_key not in args:
              raise HTTPException(status_code=400, detail=f"Missing required parameter '{param_key}' for operation '{operation}'.")
-        result = method(args[param_key])
-    else:
-        result = method()
-    
+        return method(args[param_key])
+    return method(args)
+
+def handle_raw(params: dict):
+    """
+    Raw entrypoint served at /run_raw: returns the JSON-encoded result, or for
+    read_graph an async iterator of JSON chunks that the runtime streams out.
+    """
+    operation, args = _parse_request(params)
+    if operation == "read_graph":
+        return graph.stream_graph(args)
+    return orjson.dumps(_execute(operation, args), default=_json_default)
+
+def handler(params: dict) -> dict:
+    """Skillet entrypoint: dispatches the request and wraps the result for the /run contract."""
+    result = _execute(*_parse_request(params))
     # The 'response' field must be a JSON STRING in the final response.
-    return {"response": json.dumps(result)} 
\ No newline at end of file
+    return {"response": orjson.dumps(result, default=_json_default).decode()}
@@ -1,8 +1,14 @@
+import functools
 from datetime import datetime
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from typing import Optional
 from fastapi import HTTPException
 
+@functools.lru_cache(maxsize=512)
+def _get_zone(name: str) -> ZoneInfo:
+    """ZoneInfo lookup memoized with a strong reference, so hot zones stay a dict hit."""
+    return ZoneInfo(name)
+
 async def handler(params: dict) -> dict:
     """
     Returns the current time in the specified timezone.
@@ -14,19 +20,24 @@ async def handler(params: dict) -> dict:
         tz_name = params.get("timezone") or "UTC"
         
         try:
-            tz = ZoneInfo(tz_name)
-        except ZoneInfoNotFoundError:
+            tz = _get_zone(tz_name)
+        except (ZoneInfoNotFoundError, ValueError):
+            # Not cached: lru_cache only stores successful lookups. ValueError covers
+            # keys zoneinfo refuses outright (absolute paths, "..")
             raise HTTPException(
                 status_code=400,
                 detail=f"Invalid timezone: '{tz_name}'. Please use a valid IANA timezone identifier (e.g. 'America/New_York', 'UTC', 'Europe/London')."
             )
         
         now = datetime.now(tz)
+        # One formatting pass: date and time are fixed-width prefixes of the ISO string
+        # (YYYY-MM-DDTHH:MM:SS...), whether or not microseconds are present
+        iso = now.isoformat()
         
         return {
-            "iso_8601": now.isoformat(),
-            "time": now.strftime("%H:%M:%S"),
-            "date": now.strftime("%Y-%m-%d"),
+            "iso_8601": iso,
+            "time": iso[11:19],
+            "date": iso[:10],
             "timezone": str(tz)
         }
         
@@ -40,7 +51,8 @@ async def handler(params: dict) -> dict:
 
 # Local debug
 if __name__ == "__main__":
+    import asyncio
     # Test with default timezone (UTC)
-    print(handler({}))
+    print(asyncio.run(handler({})))
     # Test with a specific timezone
-    print(handler({"timezone": "America/New_York"})) 
\ No newline at end of file
+    print(asyncio.run(handler({"timezone": "America/New_York"})))
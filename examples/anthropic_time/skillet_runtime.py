@@ -9,64 +9,172 @@ Features:
 - Runtime credential injection from client applications
 - Backward compatibility with existing /run endpoint format
 - Support for both environment variables and injected credentials
+
+Serving:
+uvloop (libuv event loop) and httptools (C HTTP parser) are pinned in
+requirements.txt and selected explicitly, as in the Dockerfile:
+
+    uvicorn skillet_runtime:app --loop uvloop --http httptools --log-level warning
+
+The skill is stateless, so set WEB_CONCURRENCY (read by uvicorn as the default
+--workers) to about the number of CPU cores to scale out.
 """
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field, create_model
-import importlib, inspect, asyncio, os, yaml
-from typing import Optional, Dict, Any, Union
-from contextlib import contextmanager
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from starlette.routing import Route
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError, create_model
+import functools, importlib, inspect, asyncio, logging, orjson, os, pickle, sys, traceback, yaml
+from typing import Optional, Dict, Any
+from contextlib import nullcontext
+from contextvars import ContextVar
+
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader
 
 # Get the directory where this script is located
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 SKILLETFILE_PATH = os.getenv("SKILLETFILE", os.path.join(SCRIPT_DIR, "Skilletfile.yaml"))
 
+# Packaged deployments may ship the skill code as a zip (see `skillet_cli.py build`);
+# putting it first on sys.path lets zipimport load the entry module from the archive.
+SKILL_ZIP = os.getenv("SKILL_ZIP")
+if SKILL_ZIP and SKILL_ZIP not in sys.path:
+    sys.path.insert(0, SKILL_ZIP)
+
+# Full tracebacks are logged server-side; only echo them to clients when asked to
+# (SKILLET_DEBUG=1; DEBUG_TRACEBACKS=1 is still honoured)
+DEBUG_TRACEBACKS = os.getenv("SKILLET_DEBUG") == "1" or os.getenv("DEBUG_TRACEBACKS") == "1"
+
+logger = logging.getLogger(__name__)
+
 # ══════════════════════════════════════════════════════════════════════════════
 # CREDENTIAL INJECTION UTILITIES
 # ══════════════════════════════════════════════════════════════════════════════
 
-@contextmanager
+# Credentials injected into the current request. Each request runs in its own
+# task, so concurrent requests never see each other's values.
+CREDS: ContextVar[Dict[str, str]] = ContextVar("skillet_credentials", default={})
+
+def get_cred(name: str, default: Optional[str] = None) -> Optional[str]:
+    """
+    Look up a credential for the current request.
+
+    Injected credentials take precedence; otherwise the process environment is used.
+
+    Args:
+        name: Credential / environment variable name, e.g. ``"API_KEY"``
+        default: Value returned when the credential is set nowhere
+    """
+    value = CREDS.get().get(name)
+    if value is None:
+        value = os.environ.get(name, default)
+    return value
+
+class _TempEnv:
+    """Injects environment variables on ``__enter__`` and restores them on ``__exit__``."""
+    __slots__ = ("credentials", "original_values")
+
+    def __init__(self, credentials: Dict[str, str]):
+        self.credentials = credentials
+        self.original_values: Dict[str, Optional[str]] = {}
+
+    def __enter__(self):
+        # Store original values to restore later, then inject in one call
+        environ = os.environ
+        self.original_values = {key: environ.get(key) for key in self.credentials}
+        environ.update(self.credentials)
+
+    def __exit__(self, *exc_info):
+        # Restore original environment state
+        environ = os.environ
+        for key, original_value in self.original_values.items():
+            if original_value is None:
+                environ.pop(key, None)
+            else:
+                environ[key] = original_value
+
+# Shared no-op context for requests without credentials
+_NULL_CTX = nullcontext()
+
 def temp_env_context(credentials: Optional[Dict[str, str]] = None):
     """
-    Context manager to temporarily inject environment variables.
+    Return a context manager that temporarily injects environment variables.
     
-    This allows credentials to be provided at request-time without
-    storing them on the server or modifying the global environment.
+    /run passes credentials through CREDS instead; this remains for skills
+    that wrap libraries which can only read ``os.environ``. Note that the
+    process environment is shared by all concurrent requests.
     
     Args:
         credentials: Dict of environment variable names and values
     """
     if not credentials:
-        yield
-        return
-    
-    # Store original values to restore later
-    original_values = {}
-    for key, value in credentials.items():
-        original_values[key] = os.environ.get(key)
-        os.environ[key] = value
-    
-    try:
-        yield
-    finally:
-        # Restore original environment state
-        for key, original_value in original_values.items():
-            if original_value is None:
-                os.environ.pop(key, None)
-            else:
-                os.environ[key] = original_value
+        return _NULL_CTX
+    return _TempEnv(credentials)
 
 # ══════════════════════════════════════════════════════════════════════════════
 # SKILLETFILE PARSING AND MODEL GENERATION
 # ══════════════════════════════════════════════════════════════════════════════
 
 # ── parse Skilletfile ──────────────────────────────────────────────
-with open(SKILLETFILE_PATH) as f:
-    meta = yaml.safe_load(f)
+def _load_meta_cached(path: str) -> Dict[str, Any]:
+    """
+    Load the Skilletfile, reusing a pickled sidecar when the YAML is unchanged.
+
+    The sidecar is keyed by the file's mtime and size, so any edit to the
+    Skilletfile triggers a fresh parse. Failing to write the sidecar (e.g. on
+    a read-only filesystem) is not an error.
+    """
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cache_path = path + ".cache.pkl"
+
+    try:
+        with open(cache_path, "rb") as f:
+            cached_stamp, cached_meta = pickle.load(f)
+        if cached_stamp == stamp:
+            return cached_meta
+    except Exception:
+        pass  # missing or unreadable cache - fall back to parsing the YAML
+
+    with open(path) as f:
+        meta = yaml.load(f, Loader=_SafeLoader)
+
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump((stamp, meta), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    return meta
+
+meta = _load_meta_cached(SKILLETFILE_PATH)
+
+@functools.lru_cache(maxsize=None)
+def _cached_import(mod_name: str, attr: str) -> Any:
+    """Resolve a ``module:attr`` entrypoint, reusing the module if already imported."""
+    module = sys.modules.get(mod_name) or importlib.import_module(mod_name)
+    return getattr(module, attr)
 
 mod_name, func_name = meta["entry"].split(":")
-skill_mod = importlib.import_module(mod_name)
-skill_fn  = getattr(skill_mod, func_name)
+skill_fn = _cached_import(mod_name, func_name)
+
+def _as_async(fn):
+    """Return ``fn`` itself if it is a coroutine function, else a thin async wrapper around it."""
+    if inspect.iscoroutinefunction(fn):
+        return fn
+    @functools.wraps(fn)
+    async def call(skill_input):
+        return fn(skill_input)
+    return call
+
+# Whether the entrypoint is async is fixed, so the call path is specialized once
+# at import and /run never branches on it per request
+_call_skill = _as_async(skill_fn)
 
 # Type mapping from YAML to Python types
 TYPE_MAP = {
@@ -76,12 +184,32 @@ TYPE_MAP = {
     "boolean": bool
 }
 
+def _type_key(type_name: str) -> str:
+    """Normalize a Skilletfile type name to a TYPE_MAP key (all lower-case), copying only if needed."""
+    return type_name if type_name.islower() else type_name.lower()
+
 # build Pydantic model for the inputs
 fields = {
-    k: (TYPE_MAP[v["type"].lower()], Field(None if v.get("required") is False else ..., description=v.get("description", "")))
+    k: (TYPE_MAP[_type_key(v["type"])], Field(None if v.get("required") is False else ..., description=v.get("description", "")))
     for k, v in meta["inputs"].items()
 }
-InputModel = create_model("InputModel", **fields)
+# Explicit config for the generated models: unknown keys are dropped and declared
+# defaults are trusted rather than re-validated
+_MODEL_CONFIG = ConfigDict(extra="ignore", validate_default=False)
+
+InputModel = create_model("InputModel", __config__=_MODEL_CONFIG, **fields)
+
+# Validation-only twin of InputModel: same types, required-ness and defaults but
+# no Field metadata. /run validates against this one; InputModel documents the body.
+InputModelFast = create_model(
+    "InputModelFast",
+    __config__=_MODEL_CONFIG,
+    **{name: (f.annotation, ... if f.is_required() else f.default) for name, f in InputModel.model_fields.items()}
+)
+
+# Bound once so /run can serialize coerced legacy payloads without
+# model_dump()'s per-call keyword handling.
+_dump_input = InputModelFast.__pydantic_serializer__.to_python
 
 # Enhanced request model with credential support
 class EnhancedSkillRequest(BaseModel):
@@ -103,33 +231,83 @@ class OutputModel(BaseModel):
 app = FastAPI(
     title=f"{meta['name']} (Enhanced)",
     description=f"{meta['description']} - Enhanced with credential injection support",
-    version=meta["version"]
+    version=meta["version"],
+    default_response_class=ORJSONResponse
 )
 
 # ══════════════════════════════════════════════════════════════════════════════
 # CORE SKILL EXECUTION LOGIC
 # ══════════════════════════════════════════════════════════════════════════════
 
-async def execute_skill_logic(skill_input: Dict[str, Any]) -> Any:
+async def execute_skill_logic(skill_input: Dict[str, Any], credentials: Optional[Dict[str, str]] = None) -> Any:
     """
     Core skill execution logic used by both legacy and enhanced endpoints.
     
     This function contains the actual skill execution and is called by both
     the legacy and enhanced endpoints to ensure consistent behavior.
+
+    Args:
+        skill_input: The validated skill parameters
+        credentials: Injected credentials, visible to the skill via ``get_cred``
+    """
+    if credentials:
+        token = CREDS.set(credentials)
+        try:
+            return await execute_skill_logic(skill_input)
+        finally:
+            CREDS.reset(token)
+    return await _call_skill(skill_input)
+
+# Validators for the two /run body shapes, built once at import
+_validate_input = InputModelFast.__pydantic_validator__.validate_python
+_enhanced_adapter = TypeAdapter(EnhancedSkillRequest)
+
+async def parse_run_request(http_request: Request):
     """
-    maybe_coroutine = skill_fn(skill_input)
-    if inspect.iscoroutine(maybe_coroutine):
-        result = await maybe_coroutine
-    else:
-        result = maybe_coroutine
-    return result
+    Validate a /run body against exactly one request model.
+
+    A ``skill_input`` key marks the enhanced format; anything else is treated as
+    legacy skill inputs. This avoids FastAPI's Union handling, which validates
+    against each model in turn.
+
+    Legacy inputs come back as a plain dict. When the body already has the right
+    types it is checked in strict mode and handed to the skill as parsed, with no
+    model instance built or dumped; only bodies that need coercion take that path.
+    """
+    try:
+        body = orjson.loads(await http_request.body())
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Request body must be valid JSON")
+    try:
+        if isinstance(body, dict) and "skill_input" in body:
+            return _enhanced_adapter.validate_python(body)
+        try:
+            _validate_input(body, strict=True)
+            return body
+        except ValidationError:
+            return _dump_input(_validate_input(body))
+    except ValidationError as e:
+        raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors()])
 
 # ══════════════════════════════════════════════════════════════════════════════
 # API ENDPOINTS
 # ══════════════════════════════════════════════════════════════════════════════
 
-@app.post("/run", response_model=OutputModel)
-async def run_skill_enhanced(request: Union[InputModel, EnhancedSkillRequest]):
+# /run reads its body itself (see parse_run_request), so the accepted formats are
+# declared for OpenAPI explicitly
+_RUN_BODY_DOC = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {
+            "anyOf": [InputModel.model_json_schema(), EnhancedSkillRequest.model_json_schema()]
+        }}}
+    }
+}
+
+# OutputModel documents the response in OpenAPI only; the skill's dict is
+# serialized as-is rather than re-validated against it on every request.
+@app.post("/run", response_model=None, responses={200: {"model": OutputModel}}, openapi_extra=_RUN_BODY_DOC)
+async def run_skill_enhanced(http_request: Request):
     """
     Enhanced /run endpoint supporting both legacy and credential injection formats.
     
@@ -150,9 +328,10 @@ async def run_skill_enhanced(request: Union[InputModel, EnhancedSkillRequest]):
     Features:
     - Runtime credential injection (perfect for Fliiq integration)
     - Backward compatible with existing request format
-    - Temporary environment variable injection
+    - Per-request credentials, read by skills with get_cred()
     - Automatic cleanup after request completion
     """
+    request = await parse_run_request(http_request)
     try:
         if isinstance(request, EnhancedSkillRequest):
             # Enhanced format: Extract credentials and inject them temporarily
@@ -163,65 +342,46 @@ async def run_skill_enhanced(request: Union[InputModel, EnhancedSkillRequest]):
                 credentials = request.credentials
             
             # Execute with credential injection
-            with temp_env_context(credentials):
-                result = await execute_skill_logic(request.skill_input)
-                return result
+            result = await execute_skill_logic(request.skill_input, credentials)
         
         else:
             # Legacy format: Direct execution (backward compatibility)
-            result = await execute_skill_logic(request.model_dump())
-            return result
+            result = await execute_skill_logic(request)
             
+    except HTTPException:
+        raise  # The handler's own client errors (e.g. 400) pass through as-is
     except Exception as e:
-        import traceback
-        error_detail = f"{str(e)}\n{traceback.format_exc()}"
+        # The id ties the client-facing error to the logged traceback
+        error_id = os.urandom(4).hex()
+        logger.exception("Skill execution failed [error_id=%s]", error_id)
+        if DEBUG_TRACEBACKS:
+            error_detail = f"{str(e)}\n{traceback.format_exc()}"
+        else:
+            error_detail = f"{str(e)} [error_id={error_id}]"
         raise HTTPException(status_code=500, detail=error_detail)
+    return ORJSONResponse(result)
 
 # ══════════════════════════════════════════════════════════════════════════════
 # DISCOVERY & METADATA ENDPOINTS
 # ══════════════════════════════════════════════════════════════════════════════
 
-@app.get("/inventory")
-async def get_skill_inventory():
-    """Return skill metadata for LLM decision-making about when and how to use this skill."""
-    
-    inventory = {
-        "skill": {
-            "name": meta["name"],
-            "description": meta["description"],
-            "version": meta["version"],
-            "category": "utility",
-            "complexity": "simple",
-            "use_cases": [
-                "When user asks about the current time",
-                "For scheduling and time-sensitive operations",
-                "Converting between timezones",
-                "Checking time in different locations",
-                "Time-based calculations and comparisons"
-            ],
-            "example_queries": [
-                "What time is it?",
-                "What time is it in Tokyo?",
-                "Tell me the current time in New York",
-                "What's the local time?",
-                "Give me the time in Pacific timezone"
-            ],
-            "input_types": ["timezone_string", "none"],
-            "output_types": ["datetime_object", "formatted_time"],
-            "performance": "fast",
-            "dependencies": [],
-            "works_well_with": ["scheduling", "calendar", "reminders", "meeting_planning"],
-            "typical_workflow_position": "data_gathering",
-            "tags": ["time", "timezone", "datetime", "utility", "quick"],
-            "supports_credential_injection": True
-        }
+# The metadata below never changes after import, so it is serialized once and
+# served as raw bytes rather than rebuilt and re-encoded on every request.
+
+_INVENTORY = {
+    "skill": {
+        "name": meta["name"],
+        "description": meta["description"],
+        "version": meta["version"],
+        # Skill-specific discovery metadata (category, use cases, tags, ...) lives
+        # in the Skilletfile so this runtime carries no per-skill data
+        **meta.get("inventory", {}),
+        "supports_credential_injection": True
     }
-    
-    return inventory
+}
 
-@app.get("/schema")
-async def get_tool_schema():
-    """Return the tool schema in a standardized format for LLM consumption."""
+def _build_tool_schema() -> Dict[str, Any]:
+    """Convert the Skilletfile inputs/outputs into a function-calling schema."""
     
     # Convert Skilletfile inputs to function calling schema
     parameters = {
@@ -261,3 +421,21 @@ async def get_tool_schema():
         "method": "POST",
         "supports_credential_injection": True
     }
+
+# Static metadata may be cached by clients and intermediaries for a few minutes
+_STATIC_HEADERS = {"cache-control": "public, max-age=300"}
+
+_INVENTORY_RESPONSE = Response(content=orjson.dumps(_INVENTORY), media_type="application/json", headers=_STATIC_HEADERS)
+_SCHEMA_RESPONSE = Response(content=orjson.dumps(_build_tool_schema()), media_type="application/json", headers=_STATIC_HEADERS)
+
+# A Response is itself an ASGI app, so the prebuilt objects are mounted as plain
+# Starlette routes: GET /inventory and /schema skip FastAPI's request parsing,
+# dependency resolution and response handling entirely.
+#   /inventory - skill metadata for LLM decision-making about when and how to use this skill
+#   /schema    - the tool schema in a standardized format for LLM consumption
+app.router.routes.append(Route("/inventory", _INVENTORY_RESPONSE, methods=["GET"], include_in_schema=False))
+app.router.routes.append(Route("/schema", _SCHEMA_RESPONSE, methods=["GET"], include_in_schema=False))
+
+# Build the OpenAPI document at import; FastAPI caches it on the app, so /docs and
+# /openapi.json never regenerate it per request
+app.openapi()
@@ -15,21 +15,35 @@ This runtime provides TWO endpoints to support different use cases:
    - Follows standard Skillet patterns
 
 Both endpoints use the same underlying documentation logic, ensuring consistent behavior.
+
+Serving:
+uvloop (libuv event loop) and httptools (C HTTP parser) are pinned in
+requirements.txt and selected explicitly; running this module directly starts
+one worker per CPU core (override with WEB_CONCURRENCY):
+
+    uvicorn skillet_runtime:app --loop uvloop --http httptools --workers 4 --log-level warning
 """
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, ValidationError
 import requests
 import json
-from typing import Optional, Dict, Any, Union
-from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Tuple
+from array import array
+from contextlib import nullcontext
+import functools
+import heapq
+import orjson
 import re
 import os
 
 app = FastAPI(
     title="Context7 Docs Skillet", 
     description="Retrieve up-to-date documentation - Enhanced with credential injection support",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # ═══════════════════════════════════════════════════════════════════
@@ -60,36 +74,47 @@ class DocsResponse(BaseModel):
 # CREDENTIAL INJECTION UTILITIES
 # ═══════════════════════════════════════════════════════════════════
 
-@contextmanager
+class _TempEnv:
+    """Injects environment variables on ``__enter__`` and restores them on ``__exit__``."""
+    __slots__ = ("credentials", "original_values")
+
+    def __init__(self, credentials: Dict[str, str]):
+        self.credentials = credentials
+        self.original_values: Dict[str, Optional[str]] = {}
+
+    def __enter__(self):
+        # Store original values to restore later, then inject in one call
+        environ = os.environ
+        self.original_values = {key: environ.get(key) for key in self.credentials}
+        environ.update(self.credentials)
+
+    def __exit__(self, *exc_info):
+        # Restore original environment state
+        environ = os.environ
+        for key, original_value in self.original_values.items():
+            if original_value is None:
+                environ.pop(key, None)
+            else:
+                environ[key] = original_value
+
+# Shared no-op context for requests without credentials
+_NULL_CTX = nullcontext()
+
 def temp_env_context(credentials: Optional[Dict[str, str]] = None):
     """
-    Context manager to temporarily inject environment variables.
+    Return a context manager that temporarily injects environment variables.
     
     This allows credentials to be provided at request-time without
     storing them on the server or modifying the global environment.
+    A plain class is used instead of @contextmanager to avoid the generator
+    machinery on every request, and no state is allocated without credentials.
     
     Args:
         credentials: Dict of environment variable names and values
     """
     if not credentials:
-        yield
-        return
-    
-    # Store original values to restore later
-    original_values = {}
-    for key, value in credentials.items():
-        original_values[key] = os.environ.get(key)
-        os.environ[key] = value
-    
-    try:
-        yield
-    finally:
-        # Restore original environment state
-        for key, original_value in original_values.items():
-            if original_value is None:
-                os.environ.pop(key, None)
-            else:
-                os.environ[key] = original_value
+        return _NULL_CTX
+    return _TempEnv(credentials)
 
 # ═══════════════════════════════════════════════════════════════════
 # DOCUMENTATION DATABASE
@@ -255,93 +280,146 @@ uvicorn main:app --reload
 # CORE DOCUMENTATION LOGIC
 # ═══════════════════════════════════════════════════════════════════
 
-def search_documentation(query: str, library: Optional[str] = None, version: str = "latest", max_results: int = 5) -> Dict[str, Any]:
-    """Search for documentation based on query"""
+# ── Document store and inverted index (built once at import) ──
+# Documents are flattened into parallel arrays indexed by doc ordinal, with library
+# and version kept as small integer ids, and the index maps each token to parallel
+# arrays of doc ordinals and term frequencies. A query is then a few dict lookups
+# and a merge over compact int arrays instead of lower()-ing and scanning every
+# document, or chasing pointers through the nested MOCK_DOCS_DB dicts.
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def _build_store(docs_db: Dict[str, Any]):
+    lib_ids: Dict[str, int] = {}
+    ver_ids: Dict[str, int] = {}
+    lib_idx, ver_idx = array("H"), array("H")
+    topics: List[str] = []
+    contents: List[str] = []
+    topics_lc: List[str] = []
+    contents_lc: List[str] = []
+    urls: List[str] = []
+    index: Dict[str, Tuple[array, array]] = {}
+    for lib_name, lib_data in docs_db.items():
+        lib_id = lib_ids.setdefault(lib_name, len(lib_ids))
+        for version, version_data in lib_data.items():
+            ver_id = ver_ids.setdefault(version, len(ver_ids))
+            for topic, doc_data in version_data.items():
+                ordinal = len(topics)
+                lib_idx.append(lib_id)
+                ver_idx.append(ver_id)
+                topics.append(topic)
+                contents.append(doc_data["content"])
+                topics_lc.append(topic.lower())
+                contents_lc.append(doc_data["content"].lower())
+                urls.append(doc_data["url"])
+                counts: Dict[str, int] = {}
+                for token in _TOKEN_RE.findall(f"{topics_lc[-1]} {contents_lc[-1]}"):
+                    counts[token] = counts.get(token, 0) + 1
+                for token, tf in counts.items():
+                    postings = index.get(token)
+                    if postings is None:
+                        postings = index[token] = (array("I"), array("I"))
+                    postings[0].append(ordinal)
+                    postings[1].append(tf)
+    return list(lib_ids), list(ver_ids), lib_idx, ver_idx, topics, contents, topics_lc, contents_lc, urls, index
+
+# LIBS/VERS: id -> name; LIB_IDX/VER_IDX/TOPICS/CONTENTS/TOPICS_LC/CONTENTS_LC/URLS:
+# per doc ordinal; INDEX: token -> (doc ordinals, term frequencies)
+LIBS, VERS, LIB_IDX, VER_IDX, TOPICS, CONTENTS, TOPICS_LC, CONTENTS_LC, URLS, INDEX = _build_store(MOCK_DOCS_DB)
+
+# Casefolded library name -> library id, and version -> version id
+_LIBRARY_IDS = {name.casefold(): i for i, name in enumerate(LIBS)}
+_VERSION_IDS = {version: i for i, version in enumerate(VERS)}
+
+def search_documentation(query: str, library: Optional[str] = None, version: str = "latest", max_results: Optional[int] = 5) -> List[Dict[str, Any]]:
+    """
+    Search for documentation based on query.
     
-    results = []
+    ``library`` is matched case-insensitively through the casefolded name map;
+    results keep the caller's spelling of it. Document text was lower-cased into
+    the index at import.
+    """
     
-    # If library is specified, search within that library
-    if library and library.lower() in MOCK_DOCS_DB:
-        lib_data = MOCK_DOCS_DB[library.lower()]
-        if version in lib_data:
-            version_data = lib_data[version]
-            for topic, doc_data in version_data.items():
-                if query.lower() in topic.lower() or query.lower() in doc_data["content"].lower():
-                    results.append({
-                        "library": library,
-                        "topic": topic,
-                        "content": doc_data["content"],
-                        "url": doc_data["url"],
-                        "relevance": calculate_relevance(query, doc_data["content"])
-                    })
-    else:
-        # Search across all libraries
-        for lib_name, lib_data in MOCK_DOCS_DB.items():
-            if version in lib_data:
-                version_data = lib_data[version]
-                for topic, doc_data in version_data.items():
-                    if query.lower() in topic.lower() or query.lower() in doc_data["content"].lower():
-                        results.append({
-                            "library": lib_name,
-                            "topic": topic,
-                            "content": doc_data["content"],
-                            "url": doc_data["url"],
-                            "relevance": calculate_relevance(query, doc_data["content"])
-                        })
-    
-    # Sort by relevance and limit results
-    results.sort(key=lambda x: x["relevance"], reverse=True)
-    return results[:max_results]
-
-def calculate_relevance(query: str, content: str) -> float:
-    """Calculate relevance score for search results"""
-    query_words = query.lower().split()
-    content_lower = content.lower()
-    
-    score = 0
-    for word in query_words:
-        # Count occurrences of each query word
-        score += content_lower.count(word)
-    
-    return score
+    ver_id = _VERSION_IDS.get(version)
+    if ver_id is None:
+        return []
+    # An unknown library falls back to searching across all libraries
+    lib_id = _LIBRARY_IDS.get(library.casefold()) if library else None
+    q = query.lower()
+    
+    # Relevance is the summed term frequency of the query tokens in each document
+    scores: Dict[int, int] = {}
+    for token in set(_TOKEN_RE.findall(q)):
+        postings = INDEX.get(token)
+        if postings is None:
+            continue
+        for ordinal, tf in zip(*postings):
+            if VER_IDX[ordinal] != ver_id or (lib_id is not None and LIB_IDX[ordinal] != lib_id):
+                continue
+            scores[ordinal] = scores.get(ordinal, 0) + tf
+    
+    # The index only knows whole tokens; a document containing the query as a
+    # substring (a partial word like "hook", or punctuation) still matches, scored
+    # by how often the query's words occur in its content
+    words = q.split()
+    for ordinal in range(len(TOPICS_LC)):
+        if ordinal in scores or VER_IDX[ordinal] != ver_id or (lib_id is not None and LIB_IDX[ordinal] != lib_id):
+            continue
+        if q in TOPICS_LC[ordinal] or q in CONTENTS_LC[ordinal]:
+            scores[ordinal] = sum(CONTENTS_LC[ordinal].count(word) for word in words)
+    
+    # Top-k by relevance; ties keep database order. max_results is Optional on the
+    # request model: null means every match, as the old results[:max_results] slice did
+    if max_results is None:
+        max_results = len(scores)
+    top = heapq.nlargest(max(0, max_results), scores.items(), key=lambda item: (item[1], -item[0]))
+    
+    results = []
+    for ordinal, relevance in top:
+        results.append({
+            "library": library if lib_id is not None else LIBS[LIB_IDX[ordinal]],
+            "topic": TOPICS[ordinal],
+            "content": CONTENTS[ordinal],
+            "url": URLS[ordinal],
+            "relevance": relevance
+        })
+    return results
 
 def format_documentation(results: list) -> str:
     """Format search results into readable documentation"""
     if not results:
         return "No documentation found for the given query."
     
-    formatted_docs = []
-    for result in results:
-        formatted_docs.append(f"""
-## {result['library'].title()} - {result['topic'].title()}
-
-{result['content']}
-
-**Source:** {result['url']}
-""")
-    
-    return "\n".join(formatted_docs)
-
-def execute_docs_logic(query: str, library: Optional[str] = None, version: str = "latest", max_results: int = 5) -> DocsResponse:
-    """
-    Core documentation logic used by both legacy and enhanced endpoints.
-    
-    This function contains the actual documentation search and is called by both
-    the legacy and enhanced endpoints to ensure consistent behavior.
-    """
-    if not query.strip():
-        raise HTTPException(status_code=400, detail="Query cannot be empty")
-    
+    # Collect small pieces and join once instead of building one large
+    # f-string per result and joining those again
+    parts = []
+    append = parts.append
+    for i, result in enumerate(results):
+        if i:
+            append("\n")
+        append("\n## ")
+        append(result['library'].title())
+        append(" - ")
+        append(result['topic'].title())
+        append("\n\n")
+        append(result['content'])
+        append("\n\n**Source:** ")
+        append(result['url'])
+        append("\n")
+    
+    return "".join(parts)
+
+def _docs_payload(query: str, library: Optional[str], version: str, max_results: int) -> Dict[str, Any]:
+    """Search and format documentation into a dict in the DocsResponse shape."""
     # Search for documentation
     results = search_documentation(query, library, version, max_results)
     
     if not results:
-        return DocsResponse(
-            documentation="No documentation found for the given query. Try different keywords or check the library name.",
-            source_url="",
-            library_info={"query": query, "library": library},
-            results_count=0
-        )
+        return {
+            "documentation": "No documentation found for the given query. Try different keywords or check the library name.",
+            "source_url": "",
+            "library_info": {"query": query, "library": library},
+            "results_count": 0
+        }
     
     # Format documentation
     formatted_docs = format_documentation(results)
@@ -357,18 +435,106 @@ def execute_docs_logic(query: str, library: Optional[str] = None, version: str =
         "topics_found": [r["topic"] for r in results]
     }
     
-    return DocsResponse(
-        documentation=formatted_docs,
-        source_url=primary_url,
-        library_info=library_info,
-        results_count=len(results)
+    return {
+        "documentation": formatted_docs,
+        "source_url": primary_url,
+        "library_info": library_info,
+        "results_count": len(results)
+    }
+
+@functools.lru_cache(maxsize=1024)
+def _cached_docs(query: str, library: Optional[str], version: str, max_results: int) -> bytes:
+    """
+    Serialized search result, memoized per request parameters.
+    
+    The search is pure over MOCK_DOCS_DB, which never changes at runtime, so a
+    repeat query skips both the search and the serialization.
+    """
+    return orjson.dumps(_docs_payload(query, library, version, max_results))
+
+def execute_docs_logic(query: str, library: Optional[str] = None, version: str = "latest", max_results: int = 5) -> Response:
+    """
+    Core documentation logic used by both legacy and enhanced endpoints.
+    
+    This function contains the actual documentation search and is called by both
+    the legacy and enhanced endpoints to ensure consistent behavior.
+    
+    Returns the JSON response (DocsResponse shape) built from cached bytes.
+    """
+    if not query or query.isspace():
+        raise HTTPException(status_code=400, detail="Query cannot be empty")
+    
+    # Keyed by the caller's spelling of library, which the response echoes back
+    body = _cached_docs(query, library, version, max_results)
+    return Response(content=body, media_type="application/json")
+
+# ═══════════════════════════════════════════════════════════════════
+# REQUEST PARSING
+# ═══════════════════════════════════════════════════════════════════
+
+async def _read_json_body(http_request: Request) -> Any:
+    """Decode the raw request body with orjson."""
+    try:
+        return orjson.loads(await http_request.body())
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Request body must be valid JSON")
+
+def _validation_error(e: ValidationError) -> RequestValidationError:
+    """Re-raise a model ValidationError as FastAPI's 422, with locations under ``body``."""
+    return RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors()])
+
+def parse_run_request(body: Any) -> tuple:
+    """
+    Split a /run body into ((query, library, version, max_results), credentials).
+
+    A ``skill_input`` key marks the enhanced format; anything else is the simple
+    format. Each body is validated against exactly one model, instead of
+    FastAPI trying every member of a Union in turn.
+    """
+    try:
+        if type(body) is dict and "skill_input" in body:
+            request = EnhancedDocsRequest.model_validate(body)
+        else:
+            request = DocsRequest.model_validate(body)
+            return (request.query, request.library, request.version, request.max_results), None
+    except ValidationError as e:
+        raise _validation_error(e)
+    
+    # Enhanced format: credentials may also arrive inside runtime_config
+    credentials = None
+    if request.runtime_config and "credentials" in request.runtime_config:
+        credentials = request.runtime_config["credentials"]
+    elif request.credentials:
+        credentials = request.credentials
+    
+    # Extract skill parameters from nested structure
+    skill_input = request.skill_input
+    params = (
+        skill_input.get("query", ""),
+        skill_input.get("library"),
+        skill_input.get("version", "latest"),
+        skill_input.get("max_results", 5)
     )
+    return params, credentials
 
 # ═══════════════════════════════════════════════════════════════════
 # API ENDPOINTS
 # ═══════════════════════════════════════════════════════════════════
 
-@app.post("/docs", response_model=DocsResponse)
+# /run reads its body itself (see parse_run_request), so the accepted formats are
+# declared for OpenAPI explicitly
+_RUN_BODY_DOC = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {
+            "anyOf": [DocsRequest.model_json_schema(), EnhancedDocsRequest.model_json_schema()]
+        }}}
+    }
+}
+
+# DocsResponse documents the responses in OpenAPI only; results are
+# serialized with orjson without a response-model validation pass.
+@app.post("/docs", response_model=None, responses={200: {"model": DocsResponse}})
 async def get_documentation_legacy(request: DocsRequest):
     """
     LEGACY ENDPOINT: Preserved for backward compatibility
@@ -389,8 +555,8 @@ async def get_documentation_legacy(request: DocsRequest):
         request.max_results
     )
 
-@app.post("/run", response_model=DocsResponse)
-async def run_enhanced(request: Union[DocsRequest, EnhancedDocsRequest]):
+@app.post("/run", response_model=None, responses={200: {"model": DocsResponse}}, openapi_extra=_RUN_BODY_DOC)
+async def run_enhanced(http_request: Request):
     """
     ENHANCED ENDPOINT: Modern production-ready endpoint
     
@@ -414,56 +580,38 @@ async def run_enhanced(request: Union[DocsRequest, EnhancedDocsRequest]):
          "credentials": {"CONTEXT7_API_KEY": "..."}
        }
     """
+    params, credentials = parse_run_request(await _read_json_body(http_request))
     
-    if isinstance(request, EnhancedDocsRequest):
-        # Enhanced format: Extract credentials and inject them temporarily
-        credentials = None
-        if request.runtime_config and "credentials" in request.runtime_config:
-            credentials = request.runtime_config["credentials"]
-        elif request.credentials:
-            credentials = request.credentials
-        
-        # Extract skill parameters from nested structure
-        skill_input = request.skill_input
-        query = skill_input.get("query", "")
-        library = skill_input.get("library")
-        version = skill_input.get("version", "latest")
-        max_results = skill_input.get("max_results", 5)
-        
-        # Execute with credential injection
-        with temp_env_context(credentials):
-            return execute_docs_logic(query, library, version, max_results)
-    
-    else:
-        # Simple format: Direct execution (same as /docs endpoint)
-        return execute_docs_logic(
-            request.query, 
-            request.library, 
-            request.version, 
-            request.max_results
-        )
+    # Execute with credential injection (a no-op context without credentials)
+    with temp_env_context(credentials):
+        return execute_docs_logic(*params)
 
 # ═══════════════════════════════════════════════════════════════════
 # UTILITY ENDPOINTS
 # ═══════════════════════════════════════════════════════════════════
 
+# Both bodies depend only on immutable module state, so they are serialized once
+_LIBRARIES_BYTES = orjson.dumps({
+    "libraries": list(MOCK_DOCS_DB.keys()),
+    "total": len(MOCK_DOCS_DB)
+})
+
+_HEALTH_BYTES = orjson.dumps({
+    "status": "healthy",
+    "available_libraries": len(MOCK_DOCS_DB),
+    "service": "context7_docs_enhanced",
+    "supports_credential_injection": True
+})
+
 @app.get("/libraries")
 async def list_libraries():
     """List available libraries in the documentation database"""
-    return {
-        "libraries": list(MOCK_DOCS_DB.keys()),
-        "total": len(MOCK_DOCS_DB)
-    }
+    return Response(content=_LIBRARIES_BYTES, media_type="application/json")
 
 @app.get("/health")
 async def health():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "available_libraries": len(MOCK_DOCS_DB),
-        "service": "context7_docs_enhanced",
-        "supports_credential_injection": True
-    }
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
 
 # ═══════════════════════════════════════════════════════════════════
 # DISCOVERY & METADATA ENDPOINTS
@@ -569,5 +717,15 @@ async def get_tool_schema():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Multiple workers need the app as an import string; the service is stateless,
+    # so default to one worker per core (override with WEB_CONCURRENCY)
+    uvicorn.run(
+        "skillet_runtime:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", 0)) or os.cpu_count() or 2,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning"
+    )
 
@@ -15,22 +15,50 @@ This runtime provides TWO endpoints to support different use cases:
    - Follows standard Skillet patterns
 
 Both endpoints use the same underlying text-to-audio logic, ensuring consistent behavior.
+
+Serving:
+uvloop (libuv event loop) and httptools (C HTTP parser) are pinned in
+requirements.txt and selected explicitly; running this module directly starts
+one worker per CPU core (override with WEB_CONCURRENCY):
+
+    uvicorn skillet_runtime:app --loop uvloop --http httptools --workers 4 --log-level warning
 """
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, ValidationError
+import asyncio
+import functools
 import os
-import requests
-import json
+import httpx
+import orjson
 import time
-from typing import Optional, Dict, Any, Union
-from contextlib import contextmanager
-import uuid
+from typing import Optional, Dict, Any
+from contextlib import asynccontextmanager, nullcontext
+from contextvars import ContextVar
+import itertools
+
+# Shared async HTTP client: every request reuses one connection pool (and HTTP/2
+# session to the MiniMax host) instead of opening a new connection per call
+HTTP = httpx.AsyncClient(
+    http2=True,
+    timeout=30,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Close the shared HTTP client's connections on shutdown."""
+    yield
+    await HTTP.aclose()
 
 app = FastAPI(
     title="MiniMax Text-to-Audio Skillet", 
     description="Convert text to audio using MiniMax API - Enhanced with credential injection support",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # ═══════════════════════════════════════════════════════════════════
@@ -61,36 +89,49 @@ class TextToAudioResponse(BaseModel):
 # CREDENTIAL INJECTION UTILITIES
 # ═══════════════════════════════════════════════════════════════════
 
-@contextmanager
+# Credentials injected into the current request. Each request runs in its own
+# task, so concurrent requests never see each other's values.
+_CREDS: ContextVar[Dict[str, str]] = ContextVar("creds", default={})
+
+def get_cred(name: str, default: Optional[str] = None) -> Optional[str]:
+    """Return an injected credential for the current request, falling back to the environment."""
+    value = _CREDS.get().get(name)
+    if value is None:
+        value = os.getenv(name, default)
+    return value
+
+class _CredScope:
+    """Sets _CREDS on ``__enter__`` and resets it on ``__exit__``."""
+    __slots__ = ("credentials", "token")
+
+    def __init__(self, credentials: Dict[str, str]):
+        self.credentials = credentials
+        self.token = None
+
+    def __enter__(self):
+        self.token = _CREDS.set(self.credentials)
+
+    def __exit__(self, *exc_info):
+        _CREDS.reset(self.token)
+
+# Shared no-op context for requests without credentials
+_NULL_CTX = nullcontext()
+
 def temp_env_context(credentials: Optional[Dict[str, str]] = None):
     """
-    Context manager to temporarily inject environment variables.
+    Return a context manager that temporarily injects credentials for the current request.
     
-    This allows credentials to be provided at request-time without
-    storing them on the server or modifying the global environment.
+    Credentials are scoped to the current task via a ContextVar and read back
+    with get_cred(), so they are never written to the process-wide os.environ
+    where concurrent requests could observe or clobber them. A plain class is
+    used instead of @contextmanager to avoid the generator machinery per request.
     
     Args:
         credentials: Dict of environment variable names and values
     """
     if not credentials:
-        yield
-        return
-    
-    # Store original values to restore later
-    original_values = {}
-    for key, value in credentials.items():
-        original_values[key] = os.environ.get(key)
-        os.environ[key] = value
-    
-    try:
-        yield
-    finally:
-        # Restore original environment state
-        for key, original_value in original_values.items():
-            if original_value is None:
-                os.environ.pop(key, None)
-            else:
-                os.environ[key] = original_value
+        return _NULL_CTX
+    return _CredScope(credentials)
 
 # ═══════════════════════════════════════════════════════════════════
 # CORE TEXT-TO-AUDIO LOGIC
@@ -98,8 +139,8 @@ def temp_env_context(credentials: Optional[Dict[str, str]] = None):
 
 def get_minimax_config():
     """Get MiniMax API configuration"""
-    api_key = os.getenv("MINIMAX_API_KEY")
-    api_host = os.getenv("MINIMAX_API_HOST", "https://api.minimax.io")
+    api_key = get_cred("MINIMAX_API_KEY")
+    api_host = get_cred("MINIMAX_API_HOST", "https://api.minimax.io")
     
     if not api_key:
         raise HTTPException(
@@ -124,77 +165,113 @@ def get_minimax_config():
     
     return api_key, api_host
 
-def call_minimax_tts(text: str, voice_id: str, speed: float, volume: float) -> dict:
+# Fixed part of every TTS payload, shared rather than rebuilt per call
+_AUDIO_SETTING = {
+    "sample_rate": 22050,
+    "bitrate": 128000,
+    "format": "mp3"
+}
+
+@functools.lru_cache(maxsize=64)
+def _auth_headers(api_key: str) -> Dict[str, str]:
+    """Request headers for an API key; repeat calls with the same key reuse one dict."""
+    return {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+
+async def call_minimax_tts(text: str, voice_id: str, speed: float, volume: float) -> dict:
     """Call MiniMax Text-to-Speech API"""
     api_key, api_host = get_minimax_config()
     
     url = f"{api_host}/v1/text_to_speech"
     
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-    
     payload = {
         "text": text,
         "voice_id": voice_id,
         "speed": speed,
         "volume": volume,
-        "audio_setting": {
-            "sample_rate": 22050,
-            "bitrate": 128000,
-            "format": "mp3"
-        }
+        "audio_setting": _AUDIO_SETTING
     }
     
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
+        response = await HTTP.post(url, headers=_auth_headers(api_key), content=orjson.dumps(payload))
         response.raise_for_status()
         return response.json()
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"MiniMax API error: {str(e)}")
 
-def download_audio(audio_url: str) -> str:
-    """Download audio file from URL"""
+# Download chunk size: peak memory per in-flight download is one chunk, not the whole file
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Created once at import rather than re-checked on every download
+OUTPUT_DIR = "output"
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+# Unique output names without per-request randomness: a per-process counter behind
+# a prefix fixed at import (start time + pid keeps workers and restarts apart)
+_FILE_PREFIX = f"audio_{int(time.time()):x}_{os.getpid()}_"
+_FILE_COUNTER = itertools.count()
+
+async def download_audio(audio_url: str) -> str:
+    """Download audio file from URL, streaming it to disk chunk by chunk"""
     try:
-        response = requests.get(audio_url, timeout=30)
-        response.raise_for_status()
-        
-        # Create output directory if it doesn't exist
-        output_dir = "output"
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Generate unique filename
-        filename = f"audio_{uuid.uuid4().hex[:8]}.mp3"
-        filepath = os.path.join(output_dir, filename)
-        
-        with open(filepath, "wb") as f:
-            f.write(response.content)
+        async with HTTP.stream("GET", audio_url) as response:
+            response.raise_for_status()
+            
+            # Generate unique filename
+            filename = f"{_FILE_PREFIX}{next(_FILE_COUNTER):08x}.mp3"
+            filepath = os.path.join(OUTPUT_DIR, filename)
+            
+            # Network I/O is already async; file I/O goes to a worker thread so a
+            # slow disk never stalls the event loop. The download goes to a .part
+            # file that only takes the final name once complete, so a failed or
+            # cancelled transfer never leaves a truncated mp3 behind.
+            partpath = filepath + ".part"
+            f = await asyncio.to_thread(open, partpath, "wb")
+            try:
+                try:
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        await asyncio.to_thread(f.write, chunk)
+                finally:
+                    await asyncio.to_thread(f.close)
+                await asyncio.to_thread(os.replace, partpath, filepath)
+            except BaseException:
+                try:
+                    os.unlink(partpath)
+                except OSError:
+                    pass
+                raise
         
         return filepath
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to download audio: {str(e)}")
 
-async def text_to_audio_logic(text: str, voice_id: str = "male-qn-qingse", speed: float = 1.0, volume: float = 1.0) -> TextToAudioResponse:
+async def text_to_audio_logic(text: str, voice_id: str = "male-qn-qingse", speed: float = 1.0, volume: float = 1.0) -> Dict[str, Any]:
     """
     Core text-to-audio logic used by both legacy and enhanced endpoints.
     
     This function contains the actual text-to-audio conversion and is called by both
     the legacy and enhanced endpoints to ensure consistent behavior.
+    
+    Returns a plain dict in the TextToAudioResponse shape; the endpoints send it
+    as-is instead of re-validating it against the model.
     """
     
-    # Validate inputs
-    if not text.strip():
+    # Validate inputs before any other work. isspace() checks for blank text
+    # without copying it the way strip() does.
+    if not text or text.isspace():
         raise HTTPException(status_code=400, detail="Text cannot be empty")
     
-    if not (0.5 <= speed <= 2.0):
-        raise HTTPException(status_code=400, detail="Speed must be between 0.5 and 2.0")
-    
-    if not (0.1 <= volume <= 1.0):
+    # Valid requests pass with a single combined check; the specific message is
+    # only worked out on failure
+    if not (0.5 <= speed <= 2.0 and 0.1 <= volume <= 1.0):
+        if not (0.5 <= speed <= 2.0):
+            raise HTTPException(status_code=400, detail="Speed must be between 0.5 and 2.0")
         raise HTTPException(status_code=400, detail="Volume must be between 0.1 and 1.0")
     
     # Call MiniMax API
-    result = call_minimax_tts(text, voice_id, speed, volume)
+    result = await call_minimax_tts(text, voice_id, speed, volume)
     
     # Extract audio URL from response
     if "audio_url" not in result:
@@ -203,25 +280,119 @@ async def text_to_audio_logic(text: str, voice_id: str = "male-qn-qingse", speed
     audio_url = result["audio_url"]
     
     # Download audio file
-    audio_file = download_audio(audio_url)
+    audio_file = await download_audio(audio_url)
     
     # Get duration (estimate based on text length and speed)
     # This is an approximation - actual duration would need audio analysis
     estimated_duration = len(text.split()) * 0.6 / speed
     
-    return TextToAudioResponse(
-        audio_url=audio_url,
-        audio_file=audio_file,
-        duration=estimated_duration,
-        voice_used=voice_id
+    return {
+        "audio_url": audio_url,
+        "audio_file": audio_file,
+        "duration": estimated_duration,
+        "voice_used": voice_id
+    }
+
+_NUMBER_TYPES = (int, float)
+
+async def _read_json_body(http_request: Request) -> Any:
+    """Decode the raw request body with orjson."""
+    try:
+        return orjson.loads(await http_request.body())
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Request body must be valid JSON")
+
+def _validation_error(e: ValidationError) -> RequestValidationError:
+    """Re-raise a model ValidationError as FastAPI's 422, with locations under ``body``."""
+    return RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors()])
+
+def parse_simple_request(body: Any) -> tuple:
+    """
+    Read (text, voice_id, speed, volume) from a simple-format body.
+
+    Bodies whose fields already have the right JSON types are read directly,
+    with no model instance built. Anything else goes through
+    TextToAudioRequest for coercion and the usual 422 errors.
+    """
+    if type(body) is dict:
+        text = body.get("text")
+        voice_id = body.get("voice_id", "male-qn-qingse")
+        speed = body.get("speed", 1.0)
+        volume = body.get("volume", 1.0)
+        # type() rather than isinstance() so JSON booleans are not taken as numbers
+        if (type(text) is str
+                and (voice_id is None or type(voice_id) is str)
+                and (speed is None or type(speed) in _NUMBER_TYPES)
+                and (volume is None or type(volume) in _NUMBER_TYPES)):
+            return text, voice_id, speed, volume
+    try:
+        request = TextToAudioRequest.model_validate(body)
+    except ValidationError as e:
+        raise _validation_error(e)
+    return request.text, request.voice_id, request.speed, request.volume
+
+def parse_run_request(body: Any) -> tuple:
+    """
+    Split a /run body into (skill parameters, credentials).
+
+    A ``skill_input`` key marks the enhanced format; anything else is the simple
+    format. Well-formed enhanced bodies are likewise read without building an
+    EnhancedTextToAudioRequest.
+    """
+    if type(body) is not dict or "skill_input" not in body:
+        return parse_simple_request(body), None
+    
+    skill_input = body["skill_input"]
+    credentials = body.get("credentials")
+    runtime_config = body.get("runtime_config")
+    if not (type(skill_input) is dict
+            and (credentials is None or (type(credentials) is dict and all(type(v) is str for v in credentials.values())))
+            and (runtime_config is None or type(runtime_config) is dict)):
+        try:
+            request = EnhancedTextToAudioRequest.model_validate(body)
+        except ValidationError as e:
+            raise _validation_error(e)
+        skill_input, credentials, runtime_config = request.skill_input, request.credentials, request.runtime_config
+    
+    # Enhanced format: credentials may also arrive inside runtime_config
+    if runtime_config and "credentials" in runtime_config:
+        credentials = runtime_config["credentials"]
+    
+    # Extract skill parameters from nested structure
+    params = (
+        skill_input.get("text", ""),
+        skill_input.get("voice_id", "male-qn-qingse"),
+        skill_input.get("speed", 1.0),
+        skill_input.get("volume", 1.0)
     )
+    return params, credentials or None
 
 # ═══════════════════════════════════════════════════════════════════
 # API ENDPOINTS
 # ═══════════════════════════════════════════════════════════════════
 
-@app.post("/text_to_audio", response_model=TextToAudioResponse)
-async def text_to_audio_legacy(request: TextToAudioRequest):
+# Both endpoints read their bodies themselves, so the accepted formats are
+# declared for OpenAPI explicitly
+_TEXT_TO_AUDIO_BODY_DOC = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": TextToAudioRequest.model_json_schema()}}
+    }
+}
+
+_RUN_BODY_DOC = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {
+            "anyOf": [TextToAudioRequest.model_json_schema(), EnhancedTextToAudioRequest.model_json_schema()]
+        }}}
+    }
+}
+
+# TextToAudioResponse documents the responses in OpenAPI only; results are
+# serialized with orjson without a response-model validation pass.
+@app.post("/text_to_audio", response_model=None, responses={200: {"model": TextToAudioResponse}}, openapi_extra=_TEXT_TO_AUDIO_BODY_DOC)
+async def text_to_audio_legacy(http_request: Request):
     """
     LEGACY ENDPOINT: Preserved for backward compatibility
     
@@ -234,15 +405,11 @@ async def text_to_audio_legacy(request: TextToAudioRequest):
     - Backward compatible with existing code
     - No breaking changes for current users
     """
-    return await text_to_audio_logic(
-        request.text,
-        request.voice_id,
-        request.speed,
-        request.volume
-    )
+    params = parse_simple_request(await _read_json_body(http_request))
+    return ORJSONResponse(await text_to_audio_logic(*params))
 
-@app.post("/run", response_model=TextToAudioResponse)
-async def run_enhanced(request: Union[TextToAudioRequest, EnhancedTextToAudioRequest]):
+@app.post("/run", response_model=None, responses={200: {"model": TextToAudioResponse}}, openapi_extra=_RUN_BODY_DOC)
+async def run_enhanced(http_request: Request):
     """
     ENHANCED ENDPOINT: Modern production-ready endpoint
     
@@ -266,69 +433,63 @@ async def run_enhanced(request: Union[TextToAudioRequest, EnhancedTextToAudioReq
          "credentials": {"MINIMAX_API_KEY": "...", "MINIMAX_API_HOST": "..."}
        }
     """
+    params, credentials = parse_run_request(await _read_json_body(http_request))
     
-    if isinstance(request, EnhancedTextToAudioRequest):
-        # Enhanced format: Extract credentials and inject them temporarily
-        credentials = None
-        if request.runtime_config and "credentials" in request.runtime_config:
-            credentials = request.runtime_config["credentials"]
-        elif request.credentials:
-            credentials = request.credentials
-        
-        # Extract skill parameters from nested structure
-        skill_input = request.skill_input
-        text = skill_input.get("text", "")
-        voice_id = skill_input.get("voice_id", "male-qn-qingse")
-        speed = skill_input.get("speed", 1.0)
-        volume = skill_input.get("volume", 1.0)
-        
-        # Execute with credential injection
-        with temp_env_context(credentials):
-            return await text_to_audio_logic(text, voice_id, speed, volume)
-    
-    else:
-        # Simple format: Direct execution (same as /text_to_audio endpoint)
-        return await text_to_audio_logic(
-            request.text,
-            request.voice_id,
-            request.speed,
-            request.volume
-        )
+    # Execute with credential injection (a no-op context without credentials)
+    with temp_env_context(credentials):
+        result = await text_to_audio_logic(*params)
+    
+    return ORJSONResponse(result)
 
 # ═══════════════════════════════════════════════════════════════════
 # UTILITY ENDPOINTS
 # ═══════════════════════════════════════════════════════════════════
 
+# This would typically call the MiniMax API to get available voices
+# For now, a mock list based on common MiniMax voices, serialized once
+_VOICES_BYTES = orjson.dumps({
+    "voices": [
+        {"id": "male-qn-qingse", "name": "Male Qingse", "language": "zh"},
+        {"id": "female-shaonv", "name": "Female Shaonv", "language": "zh"},
+        {"id": "male-youthful", "name": "Male Youthful", "language": "en"},
+        {"id": "female-gentle", "name": "Female Gentle", "language": "en"}
+    ]
+})
+
 @app.get("/voices")
 async def list_voices():
     """List available voices (mock implementation)"""
-    # This would typically call the MiniMax API to get available voices
-    # For now, returning a mock list based on common MiniMax voices
-    return {
-        "voices": [
-            {"id": "male-qn-qingse", "name": "Male Qingse", "language": "zh"},
-            {"id": "female-shaonv", "name": "Female Shaonv", "language": "zh"},
-            {"id": "male-youthful", "name": "Male Youthful", "language": "en"},
-            {"id": "female-gentle", "name": "Female Gentle", "language": "en"}
-        ]
-    }
+    return Response(content=_VOICES_BYTES, media_type="application/json")
 
-@app.get("/health")
-async def health():
-    """Health check endpoint"""
+# Health reflects environment credentials, so the serialized body is only reused
+# for a few seconds; configuration changes still show up promptly
+HEALTH_TTL_SECONDS = 5.0
+_health_cache: Dict[str, Any] = {"expires": 0.0, "body": b""}
+
+def _health_body() -> bytes:
+    """Serialize the current health status"""
     try:
         api_key, api_host = get_minimax_config()
-        return {
+        return orjson.dumps({
             "status": "healthy",
             "api_host": api_host,
             "api_key_configured": bool(api_key),
             "supports_credential_injection": True
-        }
+        })
     except Exception as e:
-        return {
+        return orjson.dumps({
             "status": "unhealthy",
             "error": str(e)
-        }
+        })
+
+@app.get("/health")
+async def health():
+    """Health check endpoint"""
+    now = time.monotonic()
+    if now >= _health_cache["expires"]:
+        _health_cache["body"] = _health_body()
+        _health_cache["expires"] = now + HEALTH_TTL_SECONDS
+    return Response(content=_health_cache["body"], media_type="application/json")
 
 # ═══════════════════════════════════════════════════════════════════
 # DISCOVERY & METADATA ENDPOINTS
@@ -437,5 +598,15 @@ async def get_tool_schema():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Multiple workers need the app as an import string; the service is stateless,
+    # so default to one worker per core (override with WEB_CONCURRENCY)
+    uvicorn.run(
+        "skillet_runtime:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", 0)) or os.cpu_count() or 2,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning"
+    )
 
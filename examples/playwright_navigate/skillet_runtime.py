@@ -15,22 +15,273 @@ This runtime provides TWO endpoints to support different use cases:
    - Follows standard Skillet patterns
 
 Both endpoints use the same underlying navigation logic, ensuring consistent behavior.
+
+Serving:
+uvloop (libuv event loop) and httptools (C HTTP parser) are pinned in
+requirements.txt and selected explicitly. Each worker process launches its own
+Chromium, so running this module directly starts a single worker unless
+WEB_CONCURRENCY is set:
+
+    uvicorn skillet_runtime:app --loop uvloop --http httptools --log-level warning
 """
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, ValidationError
+import orjson
 import asyncio
 import time
 import os
-from typing import Optional, Dict, Any, Union
-from contextlib import contextmanager
-from playwright.async_api import async_playwright
-import validators
+from typing import Optional, Dict, Any
+from contextlib import asynccontextmanager, nullcontext
+from contextvars import ContextVar
+import re
+from urllib.parse import urlsplit
+
+# ═══════════════════════════════════════════════════════════════════
+# SHARED BROWSER
+# ═══════════════════════════════════════════════════════════════════
+
+# One Playwright driver and Chromium process per worker, reused by every request;
+# each request only pays for a fresh BrowserContext, not a browser launch
+_playwright = None
+_browser = None
+_browser_lock = asyncio.Lock()
+
+# Server-oriented Chromium flags: no GPU, extensions, first-run or background
+# network work, and /tmp instead of the (often tiny) container /dev/shm.
+# --no-sandbox drops Chromium's own process sandbox; the runtime is expected to
+# be isolated by its container instead.
+CHROMIUM_ARGS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--no-first-run",
+    "--disable-background-networking",
+    "--disable-features=TranslateUI,BackForwardCache",
+]
+
+async def get_browser():
+    """Return the shared Chromium browser, launching it on first use or after a crash."""
+    global _playwright, _browser
+    if _browser is not None and _browser.is_connected():
+        return _browser
+    async with _browser_lock:
+        if _browser is None or not _browser.is_connected():
+            if _playwright is None:
+                # Imported here so the driver package only loads when a browser is needed
+                from playwright.async_api import async_playwright
+                _playwright = await async_playwright().start()
+            _browser = await _playwright.chromium.launch(
+                headless=True,
+                args=CHROMIUM_ARGS,
+                chromium_sandbox=False,
+                ignore_default_args=["--enable-automation"]
+            )
+    return _browser
+
+async def close_browser():
+    """Close the shared browser and stop the Playwright driver."""
+    global _playwright, _browser
+    if _browser is not None:
+        await _browser.close()
+        _browser = None
+    if _playwright is not None:
+        await _playwright.stop()
+        _playwright = None
+
+# ── Context pool ──
+# Requests with the default viewport and user agent reuse warm BrowserContexts.
+# Contexts are recycled after a fixed number of pages, because long-lived contexts
+# accumulate memory; any other viewport/user-agent combination gets a one-off context.
+CONTEXT_POOL_SIZE = int(os.getenv("CONTEXT_POOL_SIZE", "4"))
+CONTEXT_RECYCLE_AFTER = int(os.getenv("CONTEXT_RECYCLE_AFTER", "50"))
+
+def _context_options(viewport_width: int, viewport_height: int, user_agent: Optional[str]) -> Dict[str, Any]:
+    """Build BrowserContext options for a viewport and optional user agent."""
+    context_options = {
+        "viewport": {
+            "width": viewport_width,
+            "height": viewport_height
+        }
+    }
+    if user_agent:
+        context_options["user_agent"] = user_agent
+    return context_options
+
+def _origin(url: str) -> Optional[str]:
+    parts = urlsplit(url)
+    if parts.scheme in ("http", "https") and parts.netloc:
+        return f"{parts.scheme}://{parts.netloc}"
+    return None
+
+class _PooledContext:
+    """A BrowserContext plus the browser it belongs to, the pages it has served and the origins they visited."""
+    __slots__ = ("context", "browser", "uses", "origins")
+
+    def __init__(self, context, browser):
+        self.context = context
+        self.browser = browser
+        self.uses = 0
+        self.origins = set()
+        context.on("page", self._watch)
+
+    def _watch(self, page):
+        page.on("framenavigated", self._visited)
+
+    def _visited(self, frame):
+        origin = _origin(frame.url)
+        if origin:
+            self.origins.add(origin)
+
+class ContextPool:
+    """
+    Bounded pool of BrowserContexts sharing one set of context options.
+    
+    At most ``size`` contexts exist; when all are in use, acquire() waits for
+    one to be released. A context is replaced by a fresh one once it has served
+    ``recycle_after`` pages, or dropped if its browser has gone away. When a
+    context can't be created, a None placeholder is queued instead so a waiting
+    acquire() wakes up and retries with the freed slot.
+    """
+
+    def __init__(self, options: Dict[str, Any], size: int, recycle_after: int):
+        self.options = options
+        self.size = size
+        self.recycle_after = recycle_after
+        self.created = 0
+        self.idle: asyncio.Queue = asyncio.Queue()  # _PooledContext, or None for a freed slot
+
+    async def _new(self) -> _PooledContext:
+        browser = await get_browser()
+        return _PooledContext(await browser.new_context(**self.options), browser)
+
+    def _creation_failed(self):
+        self.created -= 1
+        self.idle.put_nowait(None)
+
+    async def warm(self):
+        """Create contexts up to the pool size ahead of the first request."""
+        while self.created < self.size:
+            self.created += 1
+            try:
+                self.idle.put_nowait(await self._new())
+            except Exception:
+                self.created -= 1
+                raise
+
+    async def acquire(self) -> _PooledContext:
+        while True:
+            if not self.idle.empty():
+                item = self.idle.get_nowait()
+            elif self.created < self.size:
+                self.created += 1
+                try:
+                    return await self._new()
+                except Exception:
+                    self._creation_failed()
+                    raise
+            else:
+                item = await self.idle.get()
+            if item is None:
+                continue  # a slot was freed; create into it if no context is idle
+            if item.browser.is_connected():
+                return item
+            # Stale context from a browser that has since crashed or closed
+            self.created -= 1
+
+    async def _reset(self, item: _PooledContext):
+        """
+        Wipe everything a request left in a context before another request gets it.
+        
+        Storage.clearDataForOrigin removes localStorage, IndexedDB, Cache Storage
+        and service workers of every origin the context's pages visited; closing
+        the pages drops sessionStorage, history, page routes and open dialogs.
+        """
+        context = item.context
+        pages = context.pages
+        for page in pages:
+            for frame in page.frames:
+                item._visited(frame)
+        if item.origins:
+            session = await context.new_cdp_session(pages[0] if pages else await context.new_page())
+            for origin in item.origins:
+                await session.send("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+            await session.detach()
+            item.origins.clear()
+        for page in context.pages:
+            await page.close()
+        await context.clear_cookies()
+        await context.clear_permissions()
+
+    async def release(self, item: _PooledContext, healthy: bool = True):
+        item.uses += 1
+        if healthy and item.uses < self.recycle_after and item.browser.is_connected():
+            # Pooled only if nothing of this request's session can reach the next one;
+            # a context that can't be reset is closed and replaced below
+            try:
+                await self._reset(item)
+                self.idle.put_nowait(item)
+                return
+            except Exception:
+                pass
+        self.created -= 1
+        try:
+            await item.context.close()
+        except Exception:
+            pass  # the browser may already be gone
+        # Replace it right away so callers waiting in acquire() are not left hanging
+        try:
+            self.created += 1
+            self.idle.put_nowait(await self._new())
+        except Exception:
+            self._creation_failed()
+
+    async def close(self):
+        while not self.idle.empty():
+            item = self.idle.get_nowait()
+            if item is None:
+                continue
+            self.created -= 1
+            try:
+                await item.context.close()
+            except Exception:
+                pass
+
+# Context resets and closes run after the response is sent; shutdown waits for them
+_teardown_tasks: set = set()
+
+def _teardown_later(coro):
+    task = asyncio.get_running_loop().create_task(coro)
+    _teardown_tasks.add(task)
+    task.add_done_callback(_teardown_tasks.discard)
+
+async def wait_for_teardown():
+    """Wait for in-flight context resets and closes to finish."""
+    while _teardown_tasks:
+        await asyncio.gather(*_teardown_tasks, return_exceptions=True)
+
+_DEFAULT_CONTEXT_KEY = (1280, 720, None)
+context_pool = ContextPool(_context_options(*_DEFAULT_CONTEXT_KEY), CONTEXT_POOL_SIZE, CONTEXT_RECYCLE_AFTER)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Launch the browser and warm the context pool before serving; close both on shutdown."""
+    await get_browser()
+    await context_pool.warm()
+    yield
+    await wait_for_teardown()
+    await context_pool.close()
+    await close_browser()
 
 app = FastAPI(
     title="Playwright Navigate Skillet", 
     description="Navigate to web pages using Playwright - Enhanced with credential injection support",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # ═══════════════════════════════════════════════════════════════════
@@ -45,10 +296,11 @@ class NavigateRequest(BaseModel):
     user_agent: Optional[str] = None
     viewport_width: Optional[int] = 1280
     viewport_height: Optional[int] = 720
+    block_assets: Optional[bool] = False
 
 class EnhancedNavigateRequest(BaseModel):
     """Enhanced request model supporting credential injection for /run endpoint"""
-    skill_input: Dict[str, Any]  # Contains: url, wait_for, timeout, user_agent, viewport_width, viewport_height
+    skill_input: Dict[str, Any]  # Contains: url, wait_for, timeout, user_agent, viewport_width, viewport_height, block_assets
     credentials: Optional[Dict[str, str]] = None
     runtime_config: Optional[Dict[str, Any]] = None
 
@@ -64,84 +316,121 @@ class NavigateResponse(BaseModel):
 # CREDENTIAL INJECTION UTILITIES
 # ═══════════════════════════════════════════════════════════════════
 
-@contextmanager
+# Credentials injected into the current request. Each request runs in its own
+# task, so concurrent requests never see each other's values.
+_CREDS: ContextVar[Dict[str, str]] = ContextVar("creds", default={})
+
+def get_cred(name: str, default: Optional[str] = None) -> Optional[str]:
+    """Return an injected credential for the current request, falling back to the environment."""
+    value = _CREDS.get().get(name)
+    if value is None:
+        value = os.getenv(name, default)
+    return value
+
+class _CredScope:
+    """Sets _CREDS on ``__enter__`` and resets it on ``__exit__``."""
+    __slots__ = ("credentials", "token")
+
+    def __init__(self, credentials: Dict[str, str]):
+        self.credentials = credentials
+        self.token = None
+
+    def __enter__(self):
+        self.token = _CREDS.set(self.credentials)
+
+    def __exit__(self, *exc_info):
+        _CREDS.reset(self.token)
+
+# Shared no-op context for requests without credentials
+_NULL_CTX = nullcontext()
+
 def temp_env_context(credentials: Optional[Dict[str, str]] = None):
     """
-    Context manager to temporarily inject environment variables.
+    Return a context manager that temporarily injects credentials for the current request.
     
-    This allows credentials to be provided at request-time without
-    storing them on the server or modifying the global environment.
+    Credentials are scoped to the current task via a ContextVar and read back
+    with get_cred(), so they are never written to the process-wide os.environ
+    where concurrent requests could observe or clobber them. A plain class is
+    used instead of @contextmanager to avoid the generator machinery per request.
     
     Args:
         credentials: Dict of environment variable names and values
     """
     if not credentials:
-        yield
-        return
-    
-    # Store original values to restore later
-    original_values = {}
-    for key, value in credentials.items():
-        original_values[key] = os.environ.get(key)
-        os.environ[key] = value
-    
-    try:
-        yield
-    finally:
-        # Restore original environment state
-        for key, original_value in original_values.items():
-            if original_value is None:
-                os.environ.pop(key, None)
-            else:
-                os.environ[key] = original_value
+        return _NULL_CTX
+    return _CredScope(credentials)
 
 # ═══════════════════════════════════════════════════════════════════
 # CORE NAVIGATION LOGIC
 # ═══════════════════════════════════════════════════════════════════
 
-async def navigate_logic(url: str, wait_for: str = "load", timeout: int = 30000, user_agent: Optional[str] = None, viewport_width: int = 1280, viewport_height: int = 720) -> NavigateResponse:
+# Fast accept for the common case: http(s) URL with a DNS hostname and a path made of
+# RFC 3986 characters. It is strictly narrower than validators.url, which is only
+# imported and consulted for whatever this does not match (IPs, IDNs, ports, ...)
+_URL_RE = re.compile(
+    r"https?://(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z]{2,63}"
+    r"(?:[/?#][A-Za-z0-9\-._~%!$&'()*+,;=:@/?#]*)?",
+    re.IGNORECASE,
+)
+
+# "commit" returns as soon as the response headers arrive; "domcontentloaded" skips
+# waiting for images and stylesheets
+_WAIT_CONDITIONS = frozenset({"commit", "load", "domcontentloaded", "networkidle"})
+_WAIT_ERROR = f"Invalid wait_for condition. Must be one of: {sorted(_WAIT_CONDITIONS)}"
+
+# Static assets skipped when a caller passes block_assets
+_ASSET_GLOB = "**/*.{png,jpg,jpeg,gif,webp,svg,ico,woff,woff2,ttf,css}"
+
+async def _abort_route(route):
+    await route.abort()
+
+def is_valid_url(url: str) -> bool:
+    """Check a URL, falling back to the validators package only off the fast path."""
+    if _URL_RE.fullmatch(url):
+        return True
+    import validators
+    return bool(validators.url(url))
+
+async def navigate_logic(url: str, wait_for: str = "load", timeout: int = 30000, user_agent: Optional[str] = None, viewport_width: int = 1280, viewport_height: int = 720, block_assets: bool = False) -> Dict[str, Any]:
     """
     Core navigation logic used by both legacy and enhanced endpoints.
     
     This function contains the actual navigation logic and is called by both
     the legacy and enhanced endpoints to ensure consistent behavior.
+    
+    Returns a plain dict in the NavigateResponse shape; the endpoints send it
+    as-is instead of re-validating it against the model.
     """
     
     # Validate URL
-    if not validators.url(url):
+    if not is_valid_url(url):
         raise HTTPException(status_code=400, detail="Invalid URL format")
     
     # Validate wait_for parameter
-    valid_wait_conditions = ["load", "domcontentloaded", "networkidle"]
-    if wait_for not in valid_wait_conditions:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Invalid wait_for condition. Must be one of: {valid_wait_conditions}"
-        )
+    if wait_for not in _WAIT_CONDITIONS:
+        raise HTTPException(status_code=400, detail=_WAIT_ERROR)
     
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     try:
-        async with async_playwright() as p:
-            # Launch browser
-            browser = await p.chromium.launch(headless=True)
-            
-            # Create context with custom settings
-            context_options = {
-                "viewport": {
-                    "width": viewport_width,
-                    "height": viewport_height
-                }
-            }
-            
-            if user_agent:
-                context_options["user_agent"] = user_agent
-            
-            context = await browser.new_context(**context_options)
-            
-            # Create page
+        # Default settings share the warm pool; anything else gets a one-off context
+        pooled = (viewport_width, viewport_height, user_agent or None) == _DEFAULT_CONTEXT_KEY
+        if pooled:
+            item = await context_pool.acquire()
+            context = item.context
+        else:
+            browser = await get_browser()
+            context = await browser.new_context(**_context_options(viewport_width, viewport_height, user_agent))
+        
+        healthy = False
+        try:
+            # Every request gets a fresh page, so no history, sessionStorage, JS
+            # state or route handler carries over; releasing the context closes it
             page = await context.new_page()
             
+            if block_assets:
+                await page.route(_ASSET_GLOB, _abort_route)
+            
             # Navigate to URL
             response = await page.goto(
                 url,
@@ -154,37 +443,105 @@ async def navigate_logic(url: str, wait_for: str = "load", timeout: int = 30000,
             title = await page.title()
             status_code = response.status if response else 0
             
-            # Calculate load time
-            load_time = time.time() - start_time
-            
-            # Close browser
-            await browser.close()
-            
-            return NavigateResponse(
-                success=True,
-                final_url=final_url,
-                title=title,
-                status_code=status_code,
-                load_time=round(load_time, 3)
-            )
-            
+            # Calculate load time (navigation only, not context teardown)
+            load_time = time.perf_counter() - start_time
+            healthy = True
+        finally:
+            # Pooled contexts are reset and go back to the pool (a failed one is
+            # replaced); the browser always stays up. Either way the teardown runs
+            # in the background instead of delaying the response.
+            if pooled:
+                _teardown_later(context_pool.release(item, healthy))
+            else:
+                _teardown_later(context.close())
+        
+        return {
+            "success": True,
+            "final_url": final_url,
+            "title": title,
+            "status_code": status_code,
+            "load_time": round(load_time, 3)
+        }
+        
     except Exception as e:
-        load_time = time.time() - start_time
+        load_time = time.perf_counter() - start_time
         
         # Return error response
-        return NavigateResponse(
-            success=False,
-            final_url=url,
-            title="",
-            status_code=0,
-            load_time=round(load_time, 3)
-        )
+        return {
+            "success": False,
+            "final_url": url,
+            "title": "",
+            "status_code": 0,
+            "load_time": round(load_time, 3)
+        }
+
+async def parse_run_request(http_request: Request) -> tuple:
+    """
+    Split a /run body into (url, wait_for, timeout, user_agent, viewport_width, viewport_height, block_assets) and credentials.
+
+    A ``skill_input`` key marks the enhanced format; anything else is the simple
+    format. Each body is validated against exactly one model, instead of
+    FastAPI trying every member of a Union in turn.
+    """
+    try:
+        body = orjson.loads(await http_request.body())
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Request body must be valid JSON")
+    try:
+        if isinstance(body, dict) and "skill_input" in body:
+            request = EnhancedNavigateRequest.model_validate(body)
+        else:
+            request = NavigateRequest.model_validate(body)
+            return (
+                request.url,
+                request.wait_for,
+                request.timeout,
+                request.user_agent,
+                request.viewport_width,
+                request.viewport_height,
+                request.block_assets
+            ), None
+    except ValidationError as e:
+        raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors()])
+    
+    # Enhanced format: credentials may also arrive inside runtime_config
+    credentials = None
+    if request.runtime_config and "credentials" in request.runtime_config:
+        credentials = request.runtime_config["credentials"]
+    elif request.credentials:
+        credentials = request.credentials
+    
+    # Extract skill parameters from nested structure
+    skill_input = request.skill_input
+    params = (
+        skill_input.get("url", ""),
+        skill_input.get("wait_for", "load"),
+        skill_input.get("timeout", 30000),
+        skill_input.get("user_agent"),
+        skill_input.get("viewport_width", 1280),
+        skill_input.get("viewport_height", 720),
+        skill_input.get("block_assets", False)
+    )
+    return params, credentials
 
 # ═══════════════════════════════════════════════════════════════════
 # API ENDPOINTS
 # ═══════════════════════════════════════════════════════════════════
 
-@app.post("/navigate", response_model=NavigateResponse)
+# /run reads its body itself (see parse_run_request), so the accepted formats are
+# declared for OpenAPI explicitly
+_RUN_BODY_DOC = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {
+            "anyOf": [NavigateRequest.model_json_schema(), EnhancedNavigateRequest.model_json_schema()]
+        }}}
+    }
+}
+
+# NavigateResponse documents the responses in OpenAPI only; results are
+# serialized with orjson without a response-model validation pass.
+@app.post("/navigate", response_model=None, responses={200: {"model": NavigateResponse}})
 async def navigate_legacy(request: NavigateRequest):
     """
     LEGACY ENDPOINT: Preserved for backward compatibility
@@ -198,17 +555,18 @@ async def navigate_legacy(request: NavigateRequest):
     - Backward compatible with existing code
     - No breaking changes for current users
     """
-    return await navigate_logic(
+    return ORJSONResponse(await navigate_logic(
         request.url,
         request.wait_for,
         request.timeout,
         request.user_agent,
         request.viewport_width,
-        request.viewport_height
-    )
+        request.viewport_height,
+        request.block_assets
+    ))
 
-@app.post("/run", response_model=NavigateResponse)
-async def run_enhanced(request: Union[NavigateRequest, EnhancedNavigateRequest]):
+@app.post("/run", response_model=None, responses={200: {"model": NavigateResponse}}, openapi_extra=_RUN_BODY_DOC)
+async def run_enhanced(http_request: Request):
     """
     ENHANCED ENDPOINT: Modern production-ready endpoint
     
@@ -232,51 +590,29 @@ async def run_enhanced(request: Union[NavigateRequest, EnhancedNavigateRequest])
          "credentials": {"PROXY_URL": "...", "BROWSER_CONFIG": "..."}
        }
     """
+    params, credentials = await parse_run_request(http_request)
     
-    if isinstance(request, EnhancedNavigateRequest):
-        # Enhanced format: Extract credentials and inject them temporarily
-        credentials = None
-        if request.runtime_config and "credentials" in request.runtime_config:
-            credentials = request.runtime_config["credentials"]
-        elif request.credentials:
-            credentials = request.credentials
-        
-        # Extract skill parameters from nested structure
-        skill_input = request.skill_input
-        url = skill_input.get("url", "")
-        wait_for = skill_input.get("wait_for", "load")
-        timeout = skill_input.get("timeout", 30000)
-        user_agent = skill_input.get("user_agent")
-        viewport_width = skill_input.get("viewport_width", 1280)
-        viewport_height = skill_input.get("viewport_height", 720)
-        
-        # Execute with credential injection
-        with temp_env_context(credentials):
-            return await navigate_logic(url, wait_for, timeout, user_agent, viewport_width, viewport_height)
+    # Execute with credential injection (a no-op context without credentials)
+    with temp_env_context(credentials):
+        result = await navigate_logic(*params)
     
-    else:
-        # Simple format: Direct execution (same as /navigate endpoint)
-        return await navigate_logic(
-            request.url,
-            request.wait_for,
-            request.timeout,
-            request.user_agent,
-            request.viewport_width,
-            request.viewport_height
-        )
+    return ORJSONResponse(result)
 
 # ═══════════════════════════════════════════════════════════════════
 # UTILITY ENDPOINTS
 # ═══════════════════════════════════════════════════════════════════
 
-@app.get("/health")
-async def health():
-    """Health check endpoint"""
+# Liveness probes can arrive every few seconds; the browser check result is
+# reused for a short window instead of being recomputed on every probe
+HEALTH_TTL_SECONDS = 5.0
+_health_cache: Dict[str, Any] = {"expires": 0.0, "result": None}
+
+async def _check_health() -> Dict[str, Any]:
+    """Check the shared browser (launching it only if it was never started or has crashed)"""
     try:
-        # Test if Playwright is working
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            await browser.close()
+        browser = await get_browser()
+        if not browser.is_connected():
+            raise RuntimeError("Browser is not connected")
         
         return {
             "status": "healthy",
@@ -291,63 +627,72 @@ async def health():
             "playwright": "unavailable"
         }
 
+@app.get("/health")
+async def health():
+    """Health check endpoint"""
+    now = time.monotonic()
+    if now >= _health_cache["expires"]:
+        _health_cache["result"] = await _check_health()
+        _health_cache["expires"] = now + HEALTH_TTL_SECONDS
+    return _health_cache["result"]
+
+_BROWSERS_BYTES = orjson.dumps({
+    "browsers": [
+        {"name": "chromium", "description": "Chromium browser (default)"},
+        {"name": "firefox", "description": "Firefox browser"},
+        {"name": "webkit", "description": "WebKit browser (Safari)"}
+    ],
+    "default": "chromium"
+})
+
 @app.get("/browsers")
 async def list_browsers():
     """List available browsers"""
-    return {
-        "browsers": [
-            {"name": "chromium", "description": "Chromium browser (default)"},
-            {"name": "firefox", "description": "Firefox browser"},
-            {"name": "webkit", "description": "WebKit browser (Safari)"}
-        ],
-        "default": "chromium"
-    }
+    return Response(content=_BROWSERS_BYTES, media_type="application/json")
 
 # ═══════════════════════════════════════════════════════════════════
 # DISCOVERY & METADATA ENDPOINTS  
 # ═══════════════════════════════════════════════════════════════════
 
+_INVENTORY_BYTES = orjson.dumps({
+    "skill": {
+        "name": "Playwright Web Navigation",
+        "description": "Navigate to web pages using Playwright browser automation, with support for custom viewports, wait conditions, and user agents",
+        "version": "1.0.0",
+        "category": "web_automation",
+        "complexity": "medium",
+        "use_cases": [
+            "Testing website availability and load times",
+            "Taking screenshots of web pages",
+            "Checking page titles and URLs after redirects", 
+            "Web scraping preparation and reconnaissance",
+            "Automated browser testing and validation"
+        ],
+        "example_queries": [
+            "Navigate to https://example.com and check if it loads",
+            "Visit this website and tell me the page title",
+            "Check how long it takes to load this page",
+            "Navigate to this URL with mobile viewport",
+            "Test if this website redirects properly"
+        ],
+        "input_types": ["url", "viewport_settings", "wait_conditions"],
+        "output_types": ["navigation_result", "load_metrics", "page_info"],
+        "performance": "medium",
+        "dependencies": ["playwright", "chromium_browser"],
+        "works_well_with": ["web_scraping", "testing", "monitoring", "screenshots"],
+        "typical_workflow_position": "data_gathering",
+        "tags": ["browser", "navigation", "web", "automation", "testing"],
+        "supports_credential_injection": True
+    }
+})
+
 @app.get("/inventory")
 async def get_skill_inventory():
     """Return skill metadata for LLM decision-making about when and how to use this skill."""
-    
-    inventory = {
-        "skill": {
-            "name": "Playwright Web Navigation",
-            "description": "Navigate to web pages using Playwright browser automation, with support for custom viewports, wait conditions, and user agents",
-            "version": "1.0.0",
-            "category": "web_automation",
-            "complexity": "medium",
-            "use_cases": [
-                "Testing website availability and load times",
-                "Taking screenshots of web pages",
-                "Checking page titles and URLs after redirects", 
-                "Web scraping preparation and reconnaissance",
-                "Automated browser testing and validation"
-            ],
-            "example_queries": [
-                "Navigate to https://example.com and check if it loads",
-                "Visit this website and tell me the page title",
-                "Check how long it takes to load this page",
-                "Navigate to this URL with mobile viewport",
-                "Test if this website redirects properly"
-            ],
-            "input_types": ["url", "viewport_settings", "wait_conditions"],
-            "output_types": ["navigation_result", "load_metrics", "page_info"],
-            "performance": "medium",
-            "dependencies": ["playwright", "chromium_browser"],
-            "works_well_with": ["web_scraping", "testing", "monitoring", "screenshots"],
-            "typical_workflow_position": "data_gathering",
-            "tags": ["browser", "navigation", "web", "automation", "testing"],
-            "supports_credential_injection": True
-        }
-    }
-    
-    return inventory
+    return Response(content=_INVENTORY_BYTES, media_type="application/json")
 
-@app.get("/schema")
-async def get_tool_schema():
-    """Return the tool schema in a standardized format for LLM consumption."""
+def _build_tool_schema() -> Dict[str, Any]:
+    """Build the tool schema in a standardized format for LLM consumption."""
     
     parameters = {
         "type": "object",
@@ -358,7 +703,7 @@ async def get_tool_schema():
             },
             "wait_for": {
                 "type": "string",
-                "description": "Wait condition for page loading: 'load', 'domcontentloaded', or 'networkidle' (default: 'load')"
+                "description": "Wait condition for page loading: 'commit', 'domcontentloaded', 'load', or 'networkidle' (default: 'load')"
             },
             "timeout": {
                 "type": "integer",
@@ -375,6 +720,10 @@ async def get_tool_schema():
             "viewport_height": {
                 "type": "integer",
                 "description": "Browser viewport height in pixels (default: 720)"
+            },
+            "block_assets": {
+                "type": "boolean",
+                "description": "Skip loading images, fonts and stylesheets (default: false)"
             }
         },
         "required": ["url"]
@@ -417,7 +766,24 @@ async def get_tool_schema():
         "supports_credential_injection": True
     }
 
+_SCHEMA_BYTES = orjson.dumps(_build_tool_schema())
+
+@app.get("/schema")
+async def get_tool_schema():
+    """Return the tool schema in a standardized format for LLM consumption."""
+    return Response(content=_SCHEMA_BYTES, media_type="application/json")
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Every worker runs its own Chromium, so scale out deliberately: one worker
+    # unless WEB_CONCURRENCY says otherwise (multiple workers need the import string)
+    uvicorn.run(
+        "skillet_runtime:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        loop="uvloop",
+        http="httptools",
+        log_level="warning"
+    )
 
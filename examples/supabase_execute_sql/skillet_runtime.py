@@ -15,22 +15,46 @@ This runtime provides TWO endpoints to support different use cases:
    - Follows standard Skillet patterns
 
 Both endpoints use the same underlying SQL execution logic, ensuring consistent behavior.
+
+Serving:
+uvloop (libuv event loop) and httptools (C HTTP parser) are pinned in
+requirements.txt and selected explicitly; running this module directly starts a
+single worker unless WEB_CONCURRENCY is set:
+
+    uvicorn skillet_runtime:app --loop uvloop --http httptools --log-level warning
 """
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, ValidationError
+import orjson
+import functools
 import os
 import time
 import re
-from typing import Optional, List, Dict, Any, Union
-from contextlib import contextmanager
-from supabase import create_client, Client
+from typing import TYPE_CHECKING, Optional, List, Dict, Any
+from contextlib import asynccontextmanager, nullcontext
+from contextvars import ContextVar
 import asyncio
 
+# supabase-py (and its httpx/postgrest/realtime stack) is imported on first client
+# construction rather than at startup, keeping cold starts and error-only paths cheap
+if TYPE_CHECKING:
+    from supabase import Client
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open connections to the environment-configured project before serving."""
+    await prewarm_connections()
+    yield
+
 app = FastAPI(
     title="Supabase Execute SQL Skillet", 
     description="Execute SQL queries on Supabase databases - Enhanced with credential injection support",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # ═══════════════════════════════════════════════════════════════════
@@ -62,45 +86,68 @@ class SQLResponse(BaseModel):
 # CREDENTIAL INJECTION UTILITIES
 # ═══════════════════════════════════════════════════════════════════
 
-@contextmanager
+# Credentials injected into the current request. Each request runs in its own
+# task, so concurrent requests never see each other's values.
+_CREDS: ContextVar[Dict[str, str]] = ContextVar("creds", default={})
+
+def get_cred(name: str, default: Optional[str] = None) -> Optional[str]:
+    """Return an injected credential for the current request, falling back to the environment."""
+    value = _CREDS.get().get(name)
+    if value is None:
+        value = os.getenv(name, default)
+    return value
+
+class _CredScope:
+    """Sets _CREDS on ``__enter__`` and resets it on ``__exit__``."""
+    __slots__ = ("credentials", "token")
+
+    def __init__(self, credentials: Dict[str, str]):
+        self.credentials = credentials
+        self.token = None
+
+    def __enter__(self):
+        self.token = _CREDS.set(self.credentials)
+
+    def __exit__(self, *exc_info):
+        _CREDS.reset(self.token)
+
+# Shared no-op context for requests without credentials
+_NULL_CTX = nullcontext()
+
 def temp_env_context(credentials: Optional[Dict[str, str]] = None):
     """
-    Context manager to temporarily inject environment variables.
+    Return a context manager that temporarily injects credentials for the current request.
     
-    This allows credentials to be provided at request-time without
-    storing them on the server or modifying the global environment.
+    Credentials are scoped to the current task via a ContextVar and read back
+    with get_cred(), so they are never written to the process-wide os.environ
+    where concurrent requests could observe or clobber them. A plain class is
+    used instead of @contextmanager to avoid the generator machinery per request.
     
     Args:
         credentials: Dict of environment variable names and values
     """
     if not credentials:
-        yield
-        return
-    
-    # Store original values to restore later
-    original_values = {}
-    for key, value in credentials.items():
-        original_values[key] = os.environ.get(key)
-        os.environ[key] = value
-    
-    try:
-        yield
-    finally:
-        # Restore original environment state
-        for key, original_value in original_values.items():
-            if original_value is None:
-                os.environ.pop(key, None)
-            else:
-                os.environ[key] = original_value
+        return _NULL_CTX
+    return _CredScope(credentials)
 
 # ═══════════════════════════════════════════════════════════════════
 # CORE SQL EXECUTION LOGIC
 # ═══════════════════════════════════════════════════════════════════
 
-def get_supabase_client(database_url: Optional[str] = None) -> Client:
+@functools.lru_cache(maxsize=32)
+def _cached_client(url: str, key: str) -> "Client":
+    """
+    One Supabase client per (url, key), reused across requests so its HTTP
+    connection pool and TLS sessions survive. Injected credentials give each
+    tenant its own entry; size the cache to the expected number of tenants.
+    """
+    from supabase import create_client
+    return create_client(url, key)
+
+def get_supabase_client(database_url: Optional[str] = None) -> "Client":
     """Get Supabase client"""
-    url = database_url or os.getenv("SUPABASE_URL")
-    key = os.getenv("SUPABASE_ANON_KEY") or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+    url = database_url or get_cred("SUPABASE_URL")
+    key = get_cred("SUPABASE_ANON_KEY") or get_cred("SUPABASE_SERVICE_ROLE_KEY")
     
     if not url:
         raise HTTPException(
@@ -128,41 +175,74 @@ def get_supabase_client(database_url: Optional[str] = None) -> Client:
             }
         )
     
-    return create_client(url, key)
+    return _cached_client(url, key)
+
+async def _asupabase_call(fn, *args, **kwargs):
+    """
+    Run a blocking supabase-py call (client construction, table/RPC requests)
+    in a worker thread so it never stalls the event loop. asyncio.to_thread
+    copies the current context, so get_cred() still sees injected credentials.
+    """
+    return await asyncio.to_thread(fn, *args, **kwargs)
+
+# Connections opened at startup so the first requests skip the TLS handshake
+SUPABASE_PREWARM = int(os.getenv("SUPABASE_PREWARM", "2"))
+
+def _prewarm_request(client: "Client"):
+    client.postgrest.session.head("/")
+
+async def prewarm_connections():
+    """
+    Best-effort warmup: build the client for the environment-configured project
+    and issue SUPABASE_PREWARM concurrent HEAD requests against its REST endpoint,
+    leaving that many connections in the client's pool. Failures are ignored.
+    """
+    if SUPABASE_PREWARM <= 0 or not os.getenv("SUPABASE_URL"):
+        return
+    try:
+        client = await _asupabase_call(get_supabase_client)
+        await asyncio.gather(
+            *[_asupabase_call(_prewarm_request, client) for _ in range(SUPABASE_PREWARM)],
+            return_exceptions=True
+        )
+    except Exception:
+        pass
+
+# Only the leading keyword decides the query type, so the SQL is never copied
+# or upper-cased as a whole
+_FIRST_TOKEN = re.compile(r"\s*([A-Za-z]+)")
+_QUERY_TYPES = frozenset(["SELECT", "INSERT", "UPDATE", "DELETE", "CREATE", "DROP", "ALTER"])
 
 def detect_query_type(sql: str) -> str:
-    """Detect the type of SQL query"""
-    sql_clean = sql.strip().upper()
-    
-    if sql_clean.startswith('SELECT'):
-        return 'SELECT'
-    elif sql_clean.startswith('INSERT'):
-        return 'INSERT'
-    elif sql_clean.startswith('UPDATE'):
-        return 'UPDATE'
-    elif sql_clean.startswith('DELETE'):
-        return 'DELETE'
-    elif sql_clean.startswith('CREATE'):
-        return 'CREATE'
-    elif sql_clean.startswith('DROP'):
-        return 'DROP'
-    elif sql_clean.startswith('ALTER'):
-        return 'ALTER'
-    else:
-        return 'OTHER'
+    """Detect the type of SQL query from its first keyword"""
+    match = _FIRST_TOKEN.match(sql)
+    token = match.group(1).upper() if match else ""
+    return token if token in _QUERY_TYPES else 'OTHER'
 
 def is_read_only_query(query_type: str) -> bool:
     """Check if query is read-only"""
     read_only_types = ['SELECT']
     return query_type in read_only_types
 
-def validate_sql(sql: str, read_only: bool) -> None:
-    """Validate SQL query"""
+# Basic SQL injection protection: every dangerous pattern folded into one
+# expression compiled at import, so validation is a single scan of the SQL.
+# DOTALL lets a /* ... */ comment that spans lines match as well.
+_DANGEROUS_SQL = re.compile(
+    "|".join([
+        r';\s*(?:DROP|DELETE|TRUNCATE|ALTER)\s+',
+        r'--',
+        r'/\*.*\*/',
+        r'xp_cmdshell',
+        r'sp_executesql'
+    ]),
+    re.IGNORECASE | re.DOTALL
+)
+
+def validate_sql(sql: str, read_only: bool, query_type: str) -> None:
+    """Validate SQL query (``query_type`` as returned by detect_query_type)"""
     if not sql.strip():
         raise HTTPException(status_code=400, detail="SQL query cannot be empty")
     
-    query_type = detect_query_type(sql)
-    
     if read_only and not is_read_only_query(query_type):
         raise HTTPException(
             status_code=400, 
@@ -170,24 +250,20 @@ def validate_sql(sql: str, read_only: bool) -> None:
         )
     
     # Basic SQL injection protection
-    dangerous_patterns = [
-        r';\s*(DROP|DELETE|TRUNCATE|ALTER)\s+',
-        r'--',
-        r'/\*.*\*/',
-        r'xp_cmdshell',
-        r'sp_executesql'
-    ]
-    
-    for pattern in dangerous_patterns:
-        if re.search(pattern, sql, re.IGNORECASE):
-            raise HTTPException(status_code=400, detail="Potentially dangerous SQL pattern detected")
+    if _DANGEROUS_SQL.search(sql):
+        raise HTTPException(status_code=400, detail="Potentially dangerous SQL pattern detected")
+
+# Mock query latency in seconds. Off by default so the simulators return
+# immediately; set SKILLET_SIMULATE_LATENCY (e.g. 0.1) to emulate a round-trip.
+_SIMULATE = float(os.getenv("SKILLET_SIMULATE_LATENCY", "0"))
 
 async def simulate_select_query(sql: str) -> Dict[str, Any]:
     """Simulate SELECT query execution"""
     # This is a mock implementation
     # In a real scenario, you'd parse the SQL and execute it properly
     
-    await asyncio.sleep(0.1)  # Simulate query execution time
+    if _SIMULATE:
+        await asyncio.sleep(_SIMULATE)  # Simulate query execution time
     
     # Mock data based on common table patterns
     if 'users' in sql.lower():
@@ -214,7 +290,8 @@ async def simulate_select_query(sql: str) -> Dict[str, Any]:
 
 async def simulate_write_query(sql: str, query_type: str) -> Dict[str, Any]:
     """Simulate write query execution"""
-    await asyncio.sleep(0.2)  # Simulate query execution time
+    if _SIMULATE:
+        await asyncio.sleep(_SIMULATE)  # Simulate query execution time
     
     if query_type == 'INSERT':
         return {'data': [], 'row_count': 1}
@@ -225,23 +302,25 @@ async def simulate_write_query(sql: str, query_type: str) -> Dict[str, Any]:
     else:
         return {'data': [], 'row_count': 0}
 
-async def execute_sql_logic(sql: str, database_url: Optional[str] = None, read_only: bool = True, timeout: int = 30) -> SQLResponse:
+async def execute_sql_logic(sql: str, database_url: Optional[str] = None, read_only: bool = True, timeout: int = 30) -> Dict[str, Any]:
     """
     Core SQL execution logic used by both legacy and enhanced endpoints.
     
     This function contains the actual SQL execution and is called by both
     the legacy and enhanced endpoints to ensure consistent behavior.
-    """
     
-    # Validate SQL
-    validate_sql(sql, read_only)
+    Returns a plain dict in the SQLResponse shape; the endpoints send it
+    as-is instead of re-validating it against the model.
+    """
     
+    # Detect the query type once and validate against it
     query_type = detect_query_type(sql)
-    start_time = time.time()
+    validate_sql(sql, read_only, query_type)
+    start_time = time.perf_counter()
     
     try:
-        # Get Supabase client
-        supabase = get_supabase_client(database_url)
+        # Get Supabase client (constructed off the event loop on a cache miss)
+        supabase = await _asupabase_call(get_supabase_client, database_url)
         
         # Execute query using Supabase's RPC functionality
         # Note: This is a simplified implementation
@@ -258,34 +337,90 @@ async def execute_sql_logic(sql: str, database_url: Optional[str] = None, read_o
                 raise HTTPException(status_code=400, detail="Write operations not allowed in read-only mode")
             result = await simulate_write_query(sql, query_type)
         
-        execution_time = time.time() - start_time
+        execution_time = time.perf_counter() - start_time
         
-        return SQLResponse(
-            success=True,
-            data=result.get('data', []),
-            row_count=result.get('row_count', 0),
-            execution_time=round(execution_time, 3),
-            query_type=query_type
-        )
+        return {
+            "success": True,
+            "data": result.get('data', []),
+            "row_count": result.get('row_count', 0),
+            "execution_time": round(execution_time, 3),
+            "query_type": query_type
+        }
         
     except HTTPException:
         raise
     except Exception as e:
-        execution_time = time.time() - start_time
+        execution_time = time.perf_counter() - start_time
         
-        return SQLResponse(
-            success=False,
-            data=[],
-            row_count=0,
-            execution_time=round(execution_time, 3),
-            query_type=query_type
-        )
+        return {
+            "success": False,
+            "data": [],
+            "row_count": 0,
+            "execution_time": round(execution_time, 3),
+            "query_type": query_type
+        }
+
+async def parse_run_request(http_request: Request) -> tuple:
+    """
+    Split a /run body into (sql, database_url, read_only, timeout) and credentials.
+
+    A ``skill_input`` key marks the enhanced format; anything else is the simple
+    format. Each body is validated against exactly one model, instead of
+    FastAPI trying every member of a Union in turn.
+    """
+    try:
+        body = orjson.loads(await http_request.body())
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Request body must be valid JSON")
+    try:
+        if isinstance(body, dict) and "skill_input" in body:
+            request = EnhancedSQLRequest.model_validate(body)
+        else:
+            request = SQLRequest.model_validate(body)
+            return (
+                request.sql,
+                request.database_url,
+                request.read_only,
+                request.timeout
+            ), None
+    except ValidationError as e:
+        raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors()])
+    
+    # Enhanced format: credentials may also arrive inside runtime_config
+    credentials = None
+    if request.runtime_config and "credentials" in request.runtime_config:
+        credentials = request.runtime_config["credentials"]
+    elif request.credentials:
+        credentials = request.credentials
+    
+    # Extract skill parameters from nested structure
+    skill_input = request.skill_input
+    params = (
+        skill_input.get("sql", ""),
+        skill_input.get("database_url"),
+        skill_input.get("read_only", True),
+        skill_input.get("timeout", 30)
+    )
+    return params, credentials
 
 # ═══════════════════════════════════════════════════════════════════
 # API ENDPOINTS
 # ═══════════════════════════════════════════════════════════════════
 
-@app.post("/execute_sql", response_model=SQLResponse)
+# /run reads its body itself (see parse_run_request), so the accepted formats are
+# declared for OpenAPI explicitly
+_RUN_BODY_DOC = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {
+            "anyOf": [SQLRequest.model_json_schema(), EnhancedSQLRequest.model_json_schema()]
+        }}}
+    }
+}
+
+# SQLResponse documents the responses in OpenAPI only; results are
+# serialized with orjson without a response-model validation pass.
+@app.post("/execute_sql", response_model=None, responses={200: {"model": SQLResponse}})
 async def execute_sql_legacy(request: SQLRequest):
     """
     LEGACY ENDPOINT: Preserved for backward compatibility
@@ -299,15 +434,15 @@ async def execute_sql_legacy(request: SQLRequest):
     - Backward compatible with existing code
     - No breaking changes for current users
     """
-    return await execute_sql_logic(
+    return ORJSONResponse(await execute_sql_logic(
         request.sql,
         request.database_url,
         request.read_only,
         request.timeout
-    )
+    ))
 
-@app.post("/run", response_model=SQLResponse)
-async def run_enhanced(request: Union[SQLRequest, EnhancedSQLRequest]):
+@app.post("/run", response_model=None, responses={200: {"model": SQLResponse}}, openapi_extra=_RUN_BODY_DOC)
+async def run_enhanced(http_request: Request):
     """
     ENHANCED ENDPOINT: Modern production-ready endpoint
     
@@ -331,34 +466,13 @@ async def run_enhanced(request: Union[SQLRequest, EnhancedSQLRequest]):
          "credentials": {"SUPABASE_URL": "...", "SUPABASE_ANON_KEY": "..."}
        }
     """
+    params, credentials = await parse_run_request(http_request)
     
-    if isinstance(request, EnhancedSQLRequest):
-        # Enhanced format: Extract credentials and inject them temporarily
-        credentials = None
-        if request.runtime_config and "credentials" in request.runtime_config:
-            credentials = request.runtime_config["credentials"]
-        elif request.credentials:
-            credentials = request.credentials
-        
-        # Extract skill parameters from nested structure
-        skill_input = request.skill_input
-        sql = skill_input.get("sql", "")
-        database_url = skill_input.get("database_url")
-        read_only = skill_input.get("read_only", True)
-        timeout = skill_input.get("timeout", 30)
-        
-        # Execute with credential injection
-        with temp_env_context(credentials):
-            return await execute_sql_logic(sql, database_url, read_only, timeout)
+    # Execute with credential injection (a no-op context without credentials)
+    with temp_env_context(credentials):
+        result = await execute_sql_logic(*params)
     
-    else:
-        # Simple format: Direct execution (same as /execute_sql endpoint)
-        return await execute_sql_logic(
-            request.sql,
-            request.database_url,
-            request.read_only,
-            request.timeout
-        )
+    return ORJSONResponse(result)
 
 # ═══════════════════════════════════════════════════════════════════
 # UTILITY ENDPOINTS
@@ -385,64 +499,64 @@ async def health():
             "error": str(e)
         }
 
+_QUERY_TYPES_BYTES = orjson.dumps({
+    "read_only": ["SELECT"],
+    "write": ["INSERT", "UPDATE", "DELETE", "CREATE", "DROP", "ALTER"],
+    "default_mode": "read_only"
+})
+
 @app.get("/query_types")
 async def list_query_types():
     """List supported SQL query types"""
-    return {
-        "read_only": ["SELECT"],
-        "write": ["INSERT", "UPDATE", "DELETE", "CREATE", "DROP", "ALTER"],
-        "default_mode": "read_only"
-    }
+    return Response(content=_QUERY_TYPES_BYTES, media_type="application/json")
 
 # ═══════════════════════════════════════════════════════════════════
 # DISCOVERY & METADATA ENDPOINTS
 # ═══════════════════════════════════════════════════════════════════
 
+_INVENTORY_BYTES = orjson.dumps({
+    "skill": {
+        "name": "Supabase SQL Executor",
+        "description": "Execute SQL queries against Supabase databases with safety controls, query validation, and read-only mode support",
+        "version": "1.0.0",
+        "category": "database",
+        "complexity": "medium",
+        "use_cases": [
+            "Querying application data from Supabase databases",
+            "Running analytics and reporting queries",
+            "Data exploration and analysis",
+            "Database administration and maintenance",
+            "Real-time data retrieval for applications"
+        ],
+        "required_credentials": {
+            "SUPABASE_URL": "Supabase database URL",
+            "SUPABASE_ANON_KEY": "Supabase API key for read-only operations"
+        },
+        "example_queries": [
+            "SELECT * FROM users WHERE active = true",
+            "Get the count of orders from last month",
+            "Show me the top 10 products by sales",
+            "Find all customers in California",
+            "Run this analytics query on our database"
+        ],
+        "input_types": ["sql_query", "database_url", "read_only_flag"],
+        "output_types": ["query_results", "execution_metrics", "row_data"],
+        "performance": "medium",
+        "dependencies": ["supabase", "postgresql"],
+        "works_well_with": ["analytics", "reporting", "data_visualization", "administration"],
+        "typical_workflow_position": "data_access",
+        "tags": ["database", "sql", "supabase", "query", "data"],
+        "supports_credential_injection": True
+    }
+})
+
 @app.get("/inventory")
 async def get_skill_inventory():
     """Return skill metadata for LLM decision-making about when and how to use this skill."""
-    
-    inventory = {
-        "skill": {
-            "name": "Supabase SQL Executor",
-            "description": "Execute SQL queries against Supabase databases with safety controls, query validation, and read-only mode support",
-            "version": "1.0.0",
-            "category": "database",
-            "complexity": "medium",
-            "use_cases": [
-                "Querying application data from Supabase databases",
-                "Running analytics and reporting queries",
-                "Data exploration and analysis",
-                "Database administration and maintenance",
-                "Real-time data retrieval for applications"
-            ],
-            "required_credentials": {
-                "SUPABASE_URL": "Supabase database URL",
-                "SUPABASE_ANON_KEY": "Supabase API key for read-only operations"
-            },
-            "example_queries": [
-                "SELECT * FROM users WHERE active = true",
-                "Get the count of orders from last month",
-                "Show me the top 10 products by sales",
-                "Find all customers in California",
-                "Run this analytics query on our database"
-            ],
-            "input_types": ["sql_query", "database_url", "read_only_flag"],
-            "output_types": ["query_results", "execution_metrics", "row_data"],
-            "performance": "medium",
-            "dependencies": ["supabase", "postgresql"],
-            "works_well_with": ["analytics", "reporting", "data_visualization", "administration"],
-            "typical_workflow_position": "data_access",
-            "tags": ["database", "sql", "supabase", "query", "data"],
-            "supports_credential_injection": True
-        }
-    }
-    
-    return inventory
+    return Response(content=_INVENTORY_BYTES, media_type="application/json")
 
-@app.get("/schema")
-async def get_tool_schema():
-    """Return the tool schema in a standardized format for LLM consumption."""
+def _build_tool_schema() -> Dict[str, Any]:
+    """Build the tool schema in a standardized format for LLM consumption."""
     
     parameters = {
         "type": "object",
@@ -504,7 +618,24 @@ async def get_tool_schema():
         "supports_credential_injection": True
     }
 
+_SCHEMA_BYTES = orjson.dumps(_build_tool_schema())
+
+@app.get("/schema")
+async def get_tool_schema():
+    """Return the tool schema in a standardized format for LLM consumption."""
+    return Response(content=_SCHEMA_BYTES, media_type="application/json")
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # One worker unless WEB_CONCURRENCY says otherwise (multiple workers need the
+    # app as an import string)
+    uvicorn.run(
+        "skillet_runtime:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        loop="uvloop",
+        http="httptools",
+        log_level="warning"
+    )
 
@@ -13,19 +13,35 @@ This runtime provides TWO endpoints to support different use cases:
    - Enables runtime credential injection from frontend applications
    - Compatible with Fliiq and multi-skill host architecture
    - Follows standard Skillet patterns
+   - /run/stream takes the same requests and streams the response as
+     server-sent events while it is generated
 
 Both endpoints use the same underlying chat logic, ensuring consistent behavior.
+
+Serving:
+uvloop (libuv event loop) and httptools (C HTTP parser) are pinned in
+requirements.txt and selected explicitly; running this module directly starts
+one worker (set WEB_CONCURRENCY for more; MAX_CONCURRENT_COMPLETIONS applies
+to each worker separately):
+
+    uvicorn skillet_runtime:app --loop uvloop --http httptools --workers 4 --log-level warning
 """
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
 import os
 import json
-from typing import Optional, Dict, Any, Union
-from contextlib import contextmanager
+import asyncio
+import orjson
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any
 
 try:
     import google.generativeai as genai
+    from google.ai import generativelanguage as glm
     GEMINI_AVAILABLE = True
 except ImportError:
     GEMINI_AVAILABLE = False
@@ -39,7 +55,8 @@ except ImportError:
 app = FastAPI(
     title="Zen Chat Skillet", 
     description="Collaborative thinking with AI models - Enhanced with credential injection support",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # ═══════════════════════════════════════════════════════════════════
@@ -68,51 +85,47 @@ class ChatResponse(BaseModel):
 # CREDENTIAL INJECTION UTILITIES
 # ═══════════════════════════════════════════════════════════════════
 
-@contextmanager
-def temp_env_context(credentials: Optional[Dict[str, str]] = None):
+def get_api_key(name: str, api_keys: Optional[Dict[str, str]] = None) -> Optional[str]:
     """
-    Context manager to temporarily inject environment variables.
+    Return a provider API key, preferring credentials injected with the request.
     
-    This allows credentials to be provided at request-time without
-    storing them on the server or modifying the global environment.
+    Keys are passed explicitly down to the provider clients instead of being
+    written to os.environ, so concurrent requests with different credentials
+    never see each other's keys.
     
     Args:
-        credentials: Dict of environment variable names and values
+        name: Credential name, e.g. OPENAI_API_KEY
+        api_keys: Credentials injected with the current request, if any
     """
-    if not credentials:
-        yield
-        return
-    
-    # Store original values to restore later
-    original_values = {}
-    for key, value in credentials.items():
-        original_values[key] = os.environ.get(key)
-        os.environ[key] = value
-    
-    try:
-        yield
-    finally:
-        # Restore original environment state
-        for key, original_value in original_values.items():
-            if original_value is None:
-                os.environ.pop(key, None)
-            else:
-                os.environ[key] = original_value
+    value = api_keys.get(name) if api_keys else None
+    if value is None:
+        value = os.getenv(name)
+    return value
 
 # ═══════════════════════════════════════════════════════════════════
 # AI MODEL INTEGRATION
 # ═══════════════════════════════════════════════════════════════════
 
-def get_available_models():
-    """Check which AI models are available based on current API keys"""
+def _detect_models(api_keys: Optional[Dict[str, str]] = None) -> tuple:
+    """Check which AI models have both a client library and an API key"""
     available = []
     
-    if GEMINI_AVAILABLE and os.getenv("GEMINI_API_KEY"):
+    if GEMINI_AVAILABLE and get_api_key("GEMINI_API_KEY", api_keys):
         available.append("gemini")
-    if OPENAI_AVAILABLE and os.getenv("OPENAI_API_KEY"):
+    if OPENAI_AVAILABLE and get_api_key("OPENAI_API_KEY", api_keys):
         available.append("openai")
     
-    return available
+    return tuple(available)
+
+# Nothing writes API keys into os.environ at runtime, so the environment-only
+# answer is computed once; only requests carrying credentials are re-checked
+_ENV_MODELS = _detect_models()
+
+def get_available_models(api_keys: Optional[Dict[str, str]] = None) -> tuple:
+    """Check which AI models are available based on current API keys"""
+    if not api_keys:
+        return _ENV_MODELS
+    return _detect_models(api_keys)
 
 def choose_model(preferred_model: str, available_models: list) -> tuple[str, str]:
     """Choose the best model based on preference and availability"""
@@ -127,31 +140,121 @@ def choose_model(preferred_model: str, available_models: list) -> tuple[str, str
     else:
         raise HTTPException(status_code=500, detail="No AI models available. Please configure API keys.")
 
-def call_gemini(prompt: str, max_tokens: int) -> str:
+# Provider clients are cached per API key: each one keeps its HTTP connection pool
+# and TLS sessions alive across requests. Injected keys get their own entries;
+# size the caches to the expected number of tenants.
+
+class _CachedClient:
+    """A provider client plus the number of requests using it and whether it has been evicted."""
+    __slots__ = ("client", "leases", "evicted")
+
+    def __init__(self, client):
+        self.client = client
+        self.leases = 0
+        self.evicted = False
+
+class _ClientCache:
+    """
+    Provider clients keyed by API key, least recently used evicted past ``maxsize``.
+    
+    Requests borrow a client with ``async with cache.lease(api_key)``. An evicted
+    client is closed as soon as no request is using it any more, so its
+    connection pool is released instead of lingering until garbage collection.
+    """
+
+    def __init__(self, factory, close, maxsize: int = 32):
+        self.factory = factory
+        self.close = close
+        self.maxsize = maxsize
+        self.entries: "OrderedDict[Optional[str], _CachedClient]" = OrderedDict()
+
+    async def _discard(self, entry: _CachedClient):
+        try:
+            await self.close(entry.client)
+        except Exception:
+            pass  # the pool is being dropped either way
+
+    @asynccontextmanager
+    async def lease(self, api_key: Optional[str]):
+        entry = self.entries.get(api_key)
+        if entry is None:
+            entry = self.entries[api_key] = _CachedClient(self.factory(api_key))
+        else:
+            self.entries.move_to_end(api_key)
+        # Counted before any await, so this client can't be closed under the request
+        entry.leases += 1
+        try:
+            if len(self.entries) > self.maxsize:
+                _, oldest = self.entries.popitem(last=False)
+                oldest.evicted = True
+                if oldest.leases == 0:
+                    await self._discard(oldest)
+            yield entry.client
+        finally:
+            entry.leases -= 1
+            if entry.evicted and entry.leases == 0:
+                await self._discard(entry)
+
+async def _close_openai(client):
+    await client.close()
+
+async def _close_gemini(client):
+    await client.transport.close()
+
+def _new_gemini_client(api_key: Optional[str]):
+    """A Gemini API client carrying its own key, independent of genai.configure()."""
+    return glm.GenerativeServiceAsyncClient(client_options={"api_key": api_key})
+
+_openai_clients = _ClientCache(lambda api_key: openai.AsyncOpenAI(api_key=api_key), _close_openai)
+_gemini_clients = _ClientCache(_new_gemini_client, _close_gemini)
+
+def _gemini_model(client, model_name: str):
+    """
+    A GenerativeModel that sends its requests through ``client``.
+    
+    genai.configure() is process-global, so it is never called here: each model
+    is bound to its tenant's client before first use instead of picking up
+    whichever key was configured last.
+    """
+    model = genai.GenerativeModel(model_name)
+    model._async_client = client
+    return model
+
+# Upper bound on in-flight completions per provider in this worker (each of
+# WEB_CONCURRENCY workers has its own). Neither chat API
+# accepts several prompts in one call, so concurrent requests are not coalesced;
+# they share the cached clients' connections and queue here instead of bursting
+# past the provider's rate limit.
+MAX_CONCURRENT_COMPLETIONS = int(os.getenv("MAX_CONCURRENT_COMPLETIONS", "16"))
+_PROVIDER_SLOTS = {
+    "openai": asyncio.Semaphore(MAX_CONCURRENT_COMPLETIONS),
+    "gemini": asyncio.Semaphore(MAX_CONCURRENT_COMPLETIONS),
+}
+
+async def call_gemini(prompt: str, max_tokens: int, api_key: Optional[str]) -> str:
     """Call Gemini API with fallback model support"""
     if not GEMINI_AVAILABLE:
         raise HTTPException(status_code=500, detail="Gemini library not available")
     
     try:
-        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-        
         # Try multiple model names for compatibility
         model_names = ['gemini-2.0-flash', 'gemini-1.5-flash', 'gemini-pro']
         
-        for model_name in model_names:
-            try:
-                model = genai.GenerativeModel(model_name)
-                response = model.generate_content(
-                    prompt,
-                    generation_config=genai.types.GenerationConfig(
-                        max_output_tokens=max_tokens,
-                        temperature=0.7,
+        async with _gemini_clients.lease(api_key) as client:
+            for model_name in model_names:
+                try:
+                    model = _gemini_model(client, model_name)
+                    response = await model.generate_content_async(
+                        prompt,
+                        generation_config=genai.types.GenerationConfig(
+                            max_output_tokens=max_tokens,
+                            temperature=0.7,
+                        )
                     )
-                )
-                return response.text
-            except Exception as model_error:
-                print(f"Failed to use model {model_name}: {model_error}")
-                continue
+                    return response.text
+                except Exception as model_error:
+                    print(f"Failed to use model {model_name}: {model_error}")
+                    continue
         
         # If all models fail, raise the last error
         raise HTTPException(status_code=500, detail="All Gemini models failed to respond")
@@ -159,40 +262,87 @@ def call_gemini(prompt: str, max_tokens: int) -> str:
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Gemini API error: {str(e)}")
 
-def call_openai(prompt: str, max_tokens: int) -> str:
+async def call_openai(prompt: str, max_tokens: int, api_key: Optional[str]) -> str:
     """Call OpenAI API"""
     if not OPENAI_AVAILABLE:
         raise HTTPException(status_code=500, detail="OpenAI library not available")
     
     try:
-        client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        async with _openai_clients.lease(api_key) as client:
+            response = await client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                temperature=0.7
+            )
         
-        response = client.chat.completions.create(
+        return response.choices[0].message.content
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"OpenAI API error: {str(e)}")
+
+async def stream_gemini(prompt: str, max_tokens: int, api_key: Optional[str]):
+    """Yield Gemini response text as it is generated, with the same model fallback as call_gemini"""
+    if not GEMINI_AVAILABLE:
+        raise RuntimeError("Gemini library not available")
+    
+    async with _gemini_clients.lease(api_key) as client:
+        for model_name in ['gemini-2.0-flash', 'gemini-1.5-flash', 'gemini-pro']:
+            started = False
+            try:
+                model = _gemini_model(client, model_name)
+                response = await model.generate_content_async(
+                    prompt,
+                    generation_config=genai.types.GenerationConfig(
+                        max_output_tokens=max_tokens,
+                        temperature=0.7,
+                    ),
+                    stream=True
+                )
+                async for chunk in response:
+                    started = True
+                    yield chunk.text
+                return
+            except Exception as model_error:
+                # Another model can only take over before any text has been sent
+                if started:
+                    raise
+                print(f"Failed to use model {model_name}: {model_error}")
+    
+    raise RuntimeError("All Gemini models failed to respond")
+
+async def stream_openai(prompt: str, max_tokens: int, api_key: Optional[str]):
+    """Yield OpenAI response text as it is generated"""
+    if not OPENAI_AVAILABLE:
+        raise RuntimeError("OpenAI library not available")
+    
+    async with _openai_clients.lease(api_key) as client:
+        stream = await client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[{"role": "user", "content": prompt}],
             max_tokens=max_tokens,
-            temperature=0.7
+            temperature=0.7,
+            stream=True
         )
-        
-        return response.choices[0].message.content
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"OpenAI API error: {str(e)}")
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
 
 # ═══════════════════════════════════════════════════════════════════
 # CORE CHAT LOGIC
 # ═══════════════════════════════════════════════════════════════════
 
-def execute_chat_logic(prompt: str, model: str = "auto", max_tokens: int = 1000) -> ChatResponse:
+def select_model(prompt: str, model: str = "auto", api_keys: Optional[Dict[str, str]] = None) -> tuple:
     """
-    Core chat logic used by both legacy and enhanced endpoints.
+    Validate a chat request and pick the provider that will answer it.
     
-    This function contains the actual chat execution and is called by both
-    the legacy and enhanced endpoints to ensure consistent behavior.
+    Returns (selected_model, reasoning). Raises HTTPException for an empty
+    prompt, missing credentials or an unavailable requested model, so
+    /run/stream can reject a request before any bytes are sent.
     """
     if not prompt.strip():
         raise HTTPException(status_code=400, detail="Prompt cannot be empty")
     
-    available_models = get_available_models()
+    available_models = get_available_models(api_keys)
     
     if not available_models:
         raise HTTPException(
@@ -267,13 +417,30 @@ def execute_chat_logic(prompt: str, model: str = "auto", max_tokens: int = 1000)
             selected_model = "openai"
             reasoning = "OpenAI chosen as Gemini unavailable"
     
+    if selected_model is None:
+        raise HTTPException(status_code=500, detail="No models available")
+    
+    return selected_model, reasoning
+
+async def execute_chat_logic(prompt: str, model: str = "auto", max_tokens: int = 1000, api_keys: Optional[Dict[str, str]] = None) -> ChatResponse:
+    """
+    Core chat logic used by both legacy and enhanced endpoints.
+    
+    This function contains the actual chat execution and is called by both
+    the legacy and enhanced endpoints to ensure consistent behavior.
+    Credentials injected with a /run request arrive as ``api_keys``; any key
+    not given there is read from the environment.
+    """
+    selected_model, reasoning = select_model(prompt, model, api_keys)
+    
     # Execute the request
+    # Provider calls are awaited, so other requests keep running while one waits
     if selected_model == "openai":
-        response_text = call_openai(prompt, max_tokens)
-    elif selected_model == "gemini":
-        response_text = call_gemini(prompt, max_tokens)
+        async with _PROVIDER_SLOTS["openai"]:
+            response_text = await call_openai(prompt, max_tokens, get_api_key("OPENAI_API_KEY", api_keys))
     else:
-        raise HTTPException(status_code=500, detail="No models available")
+        async with _PROVIDER_SLOTS["gemini"]:
+            response_text = await call_gemini(prompt, max_tokens, get_api_key("GEMINI_API_KEY", api_keys))
     
     return ChatResponse(
         response=response_text,
@@ -281,10 +448,97 @@ def execute_chat_logic(prompt: str, model: str = "auto", max_tokens: int = 1000)
         reasoning=reasoning
     )
 
+def _sse(event: Dict[str, Any]) -> bytes:
+    return b"data: " + orjson.dumps(event) + b"\n\n"
+
+async def stream_chat_events(prompt: str, selected_model: str, reasoning: str, max_tokens: int, api_keys: Optional[Dict[str, str]] = None):
+    """
+    Server-sent events for a request already validated by select_model.
+    
+    Each piece of text is sent as {"delta": ...} as soon as the provider
+    produces it; the stream ends with {"done": true, "model_used": ...,
+    "reasoning": ...}, or with {"error": ...} if the provider fails part-way.
+    """
+    if selected_model == "openai":
+        chunks = stream_openai(prompt, max_tokens, get_api_key("OPENAI_API_KEY", api_keys))
+    else:
+        chunks = stream_gemini(prompt, max_tokens, get_api_key("GEMINI_API_KEY", api_keys))
+    
+    # The provider slot is held for the whole stream, like a non-streaming completion
+    async with _PROVIDER_SLOTS[selected_model]:
+        try:
+            async for text in chunks:
+                yield _sse({"delta": text})
+        except Exception as e:
+            # Headers are already sent, so the failure is reported in-band
+            yield _sse({"error": f"{selected_model} API error: {str(e)}"})
+            return
+    
+    yield _sse({"done": True, "model_used": selected_model, "reasoning": reasoning})
+
+# ═══════════════════════════════════════════════════════════════════
+# REQUEST PARSING
+# ═══════════════════════════════════════════════════════════════════
+
+async def _read_json_body(http_request: Request) -> Any:
+    """Decode the raw request body with orjson."""
+    try:
+        return orjson.loads(await http_request.body())
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Request body must be valid JSON")
+
+def _validation_error(e: ValidationError) -> RequestValidationError:
+    """Re-raise a model ValidationError as FastAPI's 422, with locations under ``body``."""
+    return RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors()])
+
+def parse_run_request(body: Any) -> tuple:
+    """
+    Split a /run body into ((prompt, model, max_tokens), credentials).
+
+    A ``skill_input`` key marks the enhanced format; anything else is the simple
+    format. Each body is validated against exactly one model, instead of
+    FastAPI trying every member of a Union in turn.
+    """
+    try:
+        if type(body) is dict and "skill_input" in body:
+            request = EnhancedChatRequest.model_validate(body)
+        else:
+            request = ChatRequest.model_validate(body)
+            return (request.prompt, request.model, request.max_tokens), None
+    except ValidationError as e:
+        raise _validation_error(e)
+    
+    # Enhanced format: credentials may also arrive inside runtime_config
+    credentials = None
+    if request.runtime_config and "credentials" in request.runtime_config:
+        credentials = request.runtime_config["credentials"]
+    elif request.credentials:
+        credentials = request.credentials
+    
+    # Extract skill parameters from nested structure
+    skill_input = request.skill_input
+    params = (
+        skill_input.get("prompt", ""),
+        skill_input.get("model", "auto"),
+        skill_input.get("max_tokens", 1000)
+    )
+    return params, credentials
+
 # ═══════════════════════════════════════════════════════════════════
 # API ENDPOINTS
 # ═══════════════════════════════════════════════════════════════════
 
+# /run reads its body itself (see parse_run_request), so the accepted formats are
+# declared for OpenAPI explicitly
+_RUN_BODY_DOC = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {
+            "anyOf": [ChatRequest.model_json_schema(), EnhancedChatRequest.model_json_schema()]
+        }}}
+    }
+}
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat_legacy(request: ChatRequest):
     """
@@ -303,14 +557,14 @@ async def chat_legacy(request: ChatRequest):
     - Existing integrations that depend on the /chat endpoint
     - Simple testing and prototyping
     """
-    return execute_chat_logic(
+    return await execute_chat_logic(
         prompt=request.prompt,
         model=request.model,
         max_tokens=request.max_tokens
     )
 
-@app.post("/run", response_model=ChatResponse)
-async def run_enhanced(request: Union[ChatRequest, EnhancedChatRequest]):
+@app.post("/run", response_model=ChatResponse, openapi_extra=_RUN_BODY_DOC)
+async def run_enhanced(http_request: Request):
     """
     ENHANCED ENDPOINT: Modern production-ready endpoint
     
@@ -334,32 +588,33 @@ async def run_enhanced(request: Union[ChatRequest, EnhancedChatRequest]):
          "credentials": {"OPENAI_API_KEY": "sk-..."}
        }
     """
+    (prompt, model, max_tokens), credentials = parse_run_request(await _read_json_body(http_request))
     
-    if isinstance(request, EnhancedChatRequest):
-        # Enhanced format: Extract credentials and inject them temporarily
-        credentials = None
-        if request.runtime_config and "credentials" in request.runtime_config:
-            credentials = request.runtime_config["credentials"]
-        elif request.credentials:
-            credentials = request.credentials
-        
-        # Extract skill parameters from nested structure
-        skill_input = request.skill_input
-        prompt = skill_input.get("prompt", "")
-        model = skill_input.get("model", "auto")
-        max_tokens = skill_input.get("max_tokens", 1000)
-        
-        # Execute with credential injection
-        with temp_env_context(credentials):
-            return execute_chat_logic(prompt=prompt, model=model, max_tokens=max_tokens)
+    # Injected credentials (if any) are passed through explicitly
+    return await execute_chat_logic(prompt=prompt, model=model, max_tokens=max_tokens, api_keys=credentials)
+
+@app.post("/run/stream", response_class=StreamingResponse, openapi_extra=_RUN_BODY_DOC)
+async def run_stream(http_request: Request):
+    """
+    STREAMING ENDPOINT: /run with the response streamed as it is generated
     
-    else:
-        # Simple format: Direct execution (same as /chat endpoint)
-        return execute_chat_logic(
-            prompt=request.prompt,
-            model=request.model,
-            max_tokens=request.max_tokens
-        )
+    Accepts the same request formats and credentials as /run and returns
+    server-sent events (text/event-stream), so clients can show text before
+    the completion finishes. Invalid requests and missing credentials get the
+    same error responses as /run, before the stream starts.
+    
+    Events:
+       data: {"delta": "partial text"}
+       data: {"done": true, "model_used": "gemini", "reasoning": "..."}
+    """
+    (prompt, model, max_tokens), credentials = parse_run_request(await _read_json_body(http_request))
+    selected_model, reasoning = select_model(prompt, model, credentials)
+    
+    return StreamingResponse(
+        stream_chat_events(prompt, selected_model, reasoning, max_tokens, credentials),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
 
 # ═══════════════════════════════════════════════════════════════════
 # DISCOVERY & HEALTH ENDPOINTS
@@ -476,5 +731,16 @@ async def get_tool_schema():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Multiple workers need the app as an import string. One worker by default:
+    # MAX_CONCURRENT_COMPLETIONS is enforced per worker, so the process-wide bound
+    # is that value times WEB_CONCURRENCY
+    uvicorn.run(
+        "skillet_runtime:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        loop="uvloop",
+        http="httptools",
+        log_level="warning"
+    )
 
@@ -3,26 +3,77 @@ Skillet Discovery Service
 
 A simple aggregation service that polls multiple Skillet skills and provides
 a unified catalog of available skills for LLM agents to discover and use.
+
+Serving:
+uvloop and httptools come with uvicorn[standard] and are selected explicitly.
+Each worker polls the skills and keeps its own catalog, so running this module
+directly starts a single worker unless WEB_CONCURRENCY is set:
+
+    uvicorn main:app --loop uvloop --http httptools --log-level warning
 """
 
 import asyncio
 import json
 import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse, Response
 import httpx
+import orjson
 import yaml
 from datetime import datetime
 
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader
+
 app = FastAPI(
     title="Skillet Discovery Service",
     description="Aggregates and serves a catalog of available Skillet skills",
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=ORJSONResponse
 )
 
 # Global cache for skill inventories
 skill_catalog: Dict[str, Any] = {}
 last_updated: Optional[datetime] = None
+# /catalog body, serialized once per refresh instead of once per request
+_catalog_bytes: bytes = b"{}"
+
+# One long-lived client for all polling, so connections (HTTP/2 where the skill
+# supports it) are reused across refreshes instead of re-handshaking every time
+MAX_CONCURRENT_FETCHES = int(os.getenv("SKILLET_MAX_CONCURRENT_FETCHES", "32"))
+_http: Optional[httpx.AsyncClient] = None
+_fetch_slots = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+
+# The catalog is refreshed in the background, so read endpoints are served from
+# memory. Each skill's last inventory is kept together with its ETag/Last-Modified
+# validators; a 304 reuses the kept copy instead of re-parsing the body.
+REFRESH_SECONDS = float(os.getenv("SKILLET_REFRESH_SECONDS", "30"))
+_refresh_task: Optional[asyncio.Task] = None
+_inventories: Dict[str, Dict[str, Any]] = {}
+_conditional_headers: Dict[str, Dict[str, str]] = {}
+
+# Search indexes over the available skills, rebuilt with every catalog refresh.
+# Categorical filters become dict lookups; the free-text query is matched against
+# one pre-lowercased blob per skill instead of lowercasing fields on every search.
+available_skills: List[Dict[str, Any]] = []
+_by_category: Dict[str, Set[int]] = {}
+_by_complexity: Dict[str, Set[int]] = {}
+_by_tag: Dict[str, Set[int]] = {}
+_search_blob: List[str] = []
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared polling client, creating it on first use."""
+    global _http
+    if _http is None:
+        _http = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(5.0, connect=1.0),
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+        )
+    return _http
 
 def load_skill_urls() -> List[str]:
     """Load skill URLs from configuration file or environment variables."""
@@ -31,7 +82,7 @@ def load_skill_urls() -> List[str]:
     config_file = os.getenv("SKILLET_CONFIG", "skills.yaml")
     if os.path.exists(config_file):
         with open(config_file, 'r') as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=_SafeLoader)
             return config.get("skills", [])
     
     # Fall back to environment variable
@@ -49,7 +100,12 @@ def load_skill_urls() -> List[str]:
 async def fetch_skill_inventory(client: httpx.AsyncClient, base_url: str) -> Optional[Dict[str, Any]]:
     """Fetch inventory from a single Skillet skill."""
     try:
-        response = await client.get(f"{base_url}/inventory", timeout=5.0)
+        # Bounded fan-out: a long skill list queues here instead of opening
+        # one connection per skill at once
+        async with _fetch_slots:
+            response = await client.get(f"{base_url}/inventory", headers=_conditional_headers.get(base_url))
+        if response.status_code == 304 and base_url in _inventories:
+            return _inventories[base_url]
         response.raise_for_status()
         inventory = response.json()
         
@@ -62,6 +118,19 @@ async def fetch_skill_inventory(client: httpx.AsyncClient, base_url: str) -> Opt
                 "run": f"{base_url}/run"
             }
         
+        # Remember the validators (if the skill sends any) for the next refresh
+        conditional = {}
+        if "etag" in response.headers:
+            conditional["If-None-Match"] = response.headers["etag"]
+        if "last-modified" in response.headers:
+            conditional["If-Modified-Since"] = response.headers["last-modified"]
+        if conditional:
+            _conditional_headers[base_url] = conditional
+            _inventories[base_url] = inventory
+        else:
+            _conditional_headers.pop(base_url, None)
+            _inventories.pop(base_url, None)
+        
         return inventory
     except Exception as e:
         print(f"Failed to fetch inventory from {base_url}: {e}")
@@ -69,7 +138,7 @@ async def fetch_skill_inventory(client: httpx.AsyncClient, base_url: str) -> Opt
 
 async def update_skill_catalog():
     """Update the global skill catalog by polling all configured skills."""
-    global skill_catalog, last_updated
+    global skill_catalog, last_updated, _catalog_bytes
     
     skill_urls = load_skill_urls()
     new_catalog = {
@@ -83,36 +152,103 @@ async def update_skill_catalog():
         "skills": []
     }
     
-    async with httpx.AsyncClient() as client:
-        # Fetch inventories from all skills concurrently
-        tasks = [fetch_skill_inventory(client, url) for url in skill_urls]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+    # Fetch inventories from all skills concurrently
+    client = get_http_client()
+    tasks = [fetch_skill_inventory(client, url) for url in skill_urls]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    
+    for url, result in zip(skill_urls, results):
+        new_catalog["discovery_service"]["total_skills"] += 1
         
-        for url, result in zip(skill_urls, results):
-            new_catalog["discovery_service"]["total_skills"] += 1
-            
-            if result and not isinstance(result, Exception):
-                new_catalog["skills"].append(result)
-                new_catalog["discovery_service"]["available_skills"] += 1
-            else:
-                # Add placeholder for unavailable skills
-                new_catalog["skills"].append({
-                    "skill": {
-                        "name": f"unavailable_skill_{url.split('/')[-1]}",
-                        "base_url": url,
-                        "status": "unavailable",
-                        "error": str(result) if isinstance(result, Exception) else "No response"
-                    }
-                })
+        if result and not isinstance(result, Exception):
+            new_catalog["skills"].append(result)
+            new_catalog["discovery_service"]["available_skills"] += 1
+        else:
+            # Add placeholder for unavailable skills
+            new_catalog["skills"].append({
+                "skill": {
+                    "name": f"unavailable_skill_{url.split('/')[-1]}",
+                    "base_url": url,
+                    "status": "unavailable",
+                    "error": str(result) if isinstance(result, Exception) else "No response"
+                }
+            })
     
+    # Swapped in as a whole, together with its indexes (no await in between):
+    # readers see either the old or the new catalog
+    build_search_index(new_catalog)
+    _catalog_bytes = orjson.dumps(new_catalog)
     skill_catalog = new_catalog
     last_updated = datetime.now()
     print(f"Updated skill catalog: {new_catalog['discovery_service']['available_skills']}/{new_catalog['discovery_service']['total_skills']} skills available")
 
+def _strings(values: Any) -> List[str]:
+    """The string items of a catalog list field; anything else is skipped."""
+    if not isinstance(values, list):
+        return []
+    return [value for value in values if isinstance(value, str)]
+
+def build_search_index(catalog: Dict[str, Any]):
+    """Rebuild the available-skill list and search indexes for a catalog."""
+    global available_skills, _by_category, _by_complexity, _by_tag, _search_blob
+    
+    available = [
+        skill for skill in catalog.get("skills", [])
+        if (skill.get("skill") or {}).get("status") != "unavailable"
+    ]
+    by_category: Dict[str, Set[int]] = {}
+    by_complexity: Dict[str, Set[int]] = {}
+    by_tag: Dict[str, Set[int]] = {}
+    blobs: List[str] = []
+    
+    for i, skill in enumerate(available):
+        # Catalog data comes from remote skills: null fields and non-string list
+        # items are skipped instead of failing the whole refresh
+        info = skill.get("skill") or {}
+        by_category.setdefault(str(info.get("category") or "").lower(), set()).add(i)
+        by_complexity.setdefault(str(info.get("complexity") or "").lower(), set()).add(i)
+        for tag in _strings(info.get("tags")):
+            by_tag.setdefault(tag.lower(), set()).add(i)
+        # NUL-separated so a query never matches across two fields
+        blobs.append("\0".join([
+            str(info.get("name") or ""),
+            str(info.get("description") or ""),
+            *_strings(info.get("use_cases")),
+            *_strings(info.get("example_queries"))
+        ]).lower())
+    
+    available_skills, _by_category, _by_complexity, _by_tag, _search_blob = (
+        available, by_category, by_complexity, by_tag, blobs
+    )
+
+async def _refresh_loop():
+    """Refresh the catalog every REFRESH_SECONDS until the service shuts down."""
+    while True:
+        await asyncio.sleep(REFRESH_SECONDS)
+        try:
+            await update_skill_catalog()
+        except Exception as e:
+            print(f"Background catalog refresh failed: {e}")
+
 @app.on_event("startup")
 async def startup_event():
-    """Initialize the skill catalog on startup."""
+    """Initialize the skill catalog on startup and start the periodic refresh."""
+    global _refresh_task
+    get_http_client()
     await update_skill_catalog()
+    if REFRESH_SECONDS > 0:
+        _refresh_task = asyncio.create_task(_refresh_loop())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the periodic refresh and close the shared polling client."""
+    global _http, _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        _refresh_task = None
+    if _http is not None:
+        await _http.aclose()
+        _http = None
 
 @app.get("/catalog")
 async def get_skill_catalog():
@@ -120,7 +256,7 @@ async def get_skill_catalog():
     if not skill_catalog:
         await update_skill_catalog()
     
-    return skill_catalog
+    return Response(content=_catalog_bytes, media_type="application/json")
 
 @app.get("/skills")
 async def get_available_skills():
@@ -128,11 +264,6 @@ async def get_available_skills():
     if not skill_catalog:
         await update_skill_catalog()
     
-    available_skills = [
-        skill for skill in skill_catalog.get("skills", [])
-        if skill.get("skill", {}).get("status") != "unavailable"
-    ]
-    
     return {
         "available_skills": len(available_skills),
         "skills": available_skills
@@ -149,42 +280,29 @@ async def search_skills(
     if not skill_catalog:
         await update_skill_catalog()
     
-    available_skills = [
-        skill for skill in skill_catalog.get("skills", [])
-        if skill.get("skill", {}).get("status") != "unavailable"
-    ]
-    
-    filtered_skills = available_skills
-    
-    # Apply filters
-    if query:
-        query_lower = query.lower()
-        filtered_skills = [
-            skill for skill in filtered_skills
-            if (query_lower in skill.get("skill", {}).get("name", "").lower() or
-                query_lower in skill.get("skill", {}).get("description", "").lower() or
-                any(query_lower in uc.lower() for uc in skill.get("skill", {}).get("use_cases", [])) or
-                any(query_lower in eq.lower() for eq in skill.get("skill", {}).get("example_queries", [])))
-        ]
+    # Narrow with the categorical indexes first, then text-match the survivors
+    matches: Optional[Set[int]] = None
     
     if category:
-        filtered_skills = [
-            skill for skill in filtered_skills
-            if skill.get("skill", {}).get("category", "").lower() == category.lower()
-        ]
+        matches = _by_category.get(category.lower(), set())
     
     if complexity:
-        filtered_skills = [
-            skill for skill in filtered_skills
-            if skill.get("skill", {}).get("complexity", "").lower() == complexity.lower()
-        ]
+        found = _by_complexity.get(complexity.lower(), set())
+        matches = found if matches is None else matches & found
     
     if tags:
-        tag_list = [tag.strip().lower() for tag in tags.split(",")]
-        filtered_skills = [
-            skill for skill in filtered_skills
-            if any(tag in [t.lower() for t in skill.get("skill", {}).get("tags", [])] for tag in tag_list)
-        ]
+        found = set()
+        for tag in tags.split(","):
+            found |= _by_tag.get(tag.strip().lower(), set())
+        matches = found if matches is None else matches & found
+    
+    candidates = range(len(available_skills)) if matches is None else sorted(matches)
+    
+    if query:
+        query_lower = query.lower()
+        candidates = [i for i in candidates if query_lower in _search_blob[i]]
+    
+    filtered_skills = [available_skills[i] for i in candidates]
     
     return {
         "query": {
@@ -219,4 +337,14 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    # One worker unless WEB_CONCURRENCY says otherwise (multiple workers need the
+    # app as an import string)
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        loop="uvloop",
+        http="httptools",
+        log_level="warning"
+    ) 
\ No newline at end of file
@@ -25,6 +25,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import uvicorn
 
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader
+
 @dataclass
 class SkillConfig:
     """Configuration for a loaded skill."""
@@ -86,7 +91,7 @@ class MultiSkillHost:
         
         try:
             with open(self.config_path, 'r') as f:
-                config = yaml.safe_load(f) or {}
+                config = yaml.load(f, Loader=_SafeLoader) or {}
             
             skills_config = config.get('skills', [])
             print(f"📋 Loading {len(skills_config)} skills from configuration...")